@@ -0,0 +1,85 @@
+import time
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import DATABASE_URL
+from app.model import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Any constant works; it only has to be the same for every migrator
+MIGRATION_LOCK_ID = 727274
+MIGRATION_LOCK_POLL_SECONDS = 1
+
+
+# =========================================================
+# OFFLINE (emit SQL: alembic upgrade head --sql)
+# =========================================================
+def run_migrations_offline():
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+# =========================================================
+# ONLINE
+# =========================================================
+def _acquire_migration_lock(connection):
+    """
+    Containers rolling out together: one migrates, the rest wait and no-op.
+    Polls instead of blocking in pg_advisory_lock(), because a waiting
+    statement holds a snapshot that CREATE INDEX CONCURRENTLY would wait on.
+    """
+    while True:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+        ).scalar()
+        connection.commit()
+        if acquired:
+            return
+        time.sleep(MIGRATION_LOCK_POLL_SECONDS)
+
+
+def _run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",  # sqlite ALTER TABLE support
+    )
+
+    postgres = connection.dialect.name == "postgresql"
+    if postgres:
+        _acquire_migration_lock(connection)
+    try:
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        if postgres:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+
+
+async def run_migrations_online():
+    connectable = create_async_engine(DATABASE_URL, poolclass=pool.NullPool)
+    async with connectable.connect() as connection:
+        await connection.run_sync(_run_migrations)
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,97 @@
+"""notification inbox constraints and per-student stats
+
+Recipient rows become unique per (notification, user), so fan-out can
+insert with ON CONFLICT DO NOTHING; duplicates left by the old code are
+merged first, keeping the oldest row (read if any copy was read). The
+inbox gets its (user_id, is_read, created_at) index, and
+student_subject_stats is created and backfilled from marks and attendance.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 23:01:37.540912
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def _dedupe_recipients():
+    op.execute("""
+        UPDATE notification_recipients SET is_read = TRUE
+        WHERE NOT is_read AND EXISTS (
+            SELECT 1 FROM notification_recipients r
+            WHERE r.notification_id = notification_recipients.notification_id
+              AND r.user_id = notification_recipients.user_id
+              AND r.is_read
+        )
+    """)
+    op.execute("""
+        DELETE FROM notification_recipients
+        WHERE EXISTS (
+            SELECT 1 FROM notification_recipients r
+            WHERE r.notification_id = notification_recipients.notification_id
+              AND r.user_id = notification_recipients.user_id
+              AND r.id < notification_recipients.id
+        )
+    """)
+
+
+def _backfill_stats():
+    op.execute("""
+        INSERT INTO student_subject_stats
+            (student_id, subject_id, marks_count, marks_total,
+             attendance_count, attendance_present, updated_at)
+        SELECT student_id, subject_id, SUM(marks_count), SUM(marks_total),
+               SUM(attendance_count), SUM(attendance_present), CURRENT_TIMESTAMP
+        FROM (
+            SELECT student_id, subject_id,
+                   COUNT(score) AS marks_count, COALESCE(SUM(score), 0) AS marks_total,
+                   0 AS attendance_count, 0 AS attendance_present
+            FROM marks
+            WHERE is_active AND student_id IS NOT NULL AND subject_id IS NOT NULL
+            GROUP BY student_id, subject_id
+            UNION ALL
+            SELECT student_id, subject_id, 0, 0,
+                   COUNT(id), SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END)
+            FROM attendance
+            WHERE is_active AND student_id IS NOT NULL AND subject_id IS NOT NULL
+            GROUP BY student_id, subject_id
+        ) AS totals
+        GROUP BY student_id, subject_id
+    """)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        # keep running workers from inserting new duplicates until the constraint exists
+        op.execute("LOCK TABLE notification_recipients IN SHARE ROW EXCLUSIVE MODE")
+    _dedupe_recipients()
+    with op.batch_alter_table('notification_recipients') as batch_op:
+        batch_op.create_unique_constraint('unique_notification_recipient', ['notification_id', 'user_id'])
+    op.create_index('idx_recipient_inbox', 'notification_recipients', ['user_id', 'is_read', 'created_at'], unique=False)
+
+    op.create_table('student_subject_stats',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('marks_count', sa.Integer(), nullable=False),
+    sa.Column('marks_total', sa.Integer(), nullable=False),
+    sa.Column('attendance_count', sa.Integer(), nullable=False),
+    sa.Column('attendance_present', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'subject_id')
+    )
+    _backfill_stats()
+
+
+def downgrade():
+    op.drop_table('student_subject_stats')
+    op.drop_index('idx_recipient_inbox', table_name='notification_recipients')
+    with op.batch_alter_table('notification_recipients') as batch_op:
+        batch_op.drop_constraint('unique_notification_recipient', type_='unique')
@@ -0,0 +1,93 @@
+"""indexes matching the API's access patterns
+
+Student timelines, rosters, assignment checks, notification audiences and
+the inbox get composite (partial on Postgres) indexes; the duplicate
+idx_class_name and the ix_<table>_id indexes next to every primary key go.
+On Postgres every index is built CONCURRENTLY, so this can run against a
+live database. Before/after plans: python -m benchmarks.index_plans
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 23:05:12.118406
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("is_active")
+
+NEW_INDEXES = [
+    ("idx_marks_student_date", "marks", ["student_id", sa.text("date DESC")], ACTIVE),
+    ("idx_attendance_student_date", "attendance", ["student_id", sa.text("date DESC")], ACTIVE),
+    ("idx_behavior_student_date", "behavior", ["student_id", sa.text("date DESC")], ACTIVE),
+    ("idx_student_class", "students", ["class_id", "id"], None),
+    ("idx_student_class_active", "students", ["class_id", "user_id"], ACTIVE),
+    ("idx_assignment_teacher", "class_assignments", ["teacher_id", "class_id", "subject_id"], None),
+    ("idx_assignment_class", "class_assignments", ["class_id", "teacher_id"], None),
+    ("idx_notification_class", "notifications", ["class_id", "id"], None),
+    ("idx_recipient_unread", "notification_recipients", ["user_id"], sa.text("NOT is_read AND is_active")),
+]
+
+PRIMARY_KEY_INDEXES = [
+    ("ix_users_id", "users"),
+    ("ix_classes_id", "classes"),
+    ("ix_subjects_id", "subjects"),
+    ("ix_students_id", "students"),
+    ("ix_teachers_id", "teachers"),
+    ("ix_schedules_id", "schedules"),
+    ("ix_class_assignments_id", "class_assignments"),
+    ("ix_assignment_schedules_id", "assignment_schedules"),
+    ("ix_marks_id", "marks"),
+    ("ix_attendance_id", "attendance"),
+    ("ix_behavior_id", "behavior"),
+    ("ix_notifications_id", "notifications"),
+    ("ix_notification_recipients_id", "notification_recipients"),
+]
+
+
+def _create(name, table, columns, where=None):
+    op.create_index(name, table, columns, postgresql_where=where,
+                    postgresql_concurrently=True, if_not_exists=True)
+
+
+def _drop(name, table):
+    op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def _replace_inbox_index(columns):
+    """Swap idx_recipient_inbox for a new definition without a window where the inbox is unindexed."""
+    if op.get_bind().dialect.name == "postgresql":
+        _create("idx_recipient_inbox_new", "notification_recipients", columns)
+        _drop("idx_recipient_inbox", "notification_recipients")
+        op.execute("ALTER INDEX idx_recipient_inbox_new RENAME TO idx_recipient_inbox")
+    else:
+        _drop("idx_recipient_inbox", "notification_recipients")
+        _create("idx_recipient_inbox", "notification_recipients", columns)
+
+
+def upgrade():
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in NEW_INDEXES:
+            _create(name, table, columns, where)
+        _replace_inbox_index(["user_id", sa.text("created_at DESC"), sa.text("id DESC")])
+
+        _drop("idx_class_name", "classes")
+        for name, table in PRIMARY_KEY_INDEXES:
+            _drop(name, table)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table in PRIMARY_KEY_INDEXES:
+            _create(name, table, ["id"])
+        _create("idx_class_name", "classes", ["name"])
+
+        _replace_inbox_index(["user_id", "is_read", "created_at"])
+        for name, table, _, _ in reversed(NEW_INDEXES):
+            _drop(name, table)
@@ -0,0 +1,105 @@
+import os
+import asyncio
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import model, schemas
+from app.cache import TTLCache, class_marks_version
+
+# =========================================================
+# CONFIG
+# =========================================================
+HISTOGRAM_BINS = int(os.getenv("ANALYTICS_HISTOGRAM_BINS", 10))
+SCORE_RANGE = (0, int(os.getenv("ANALYTICS_MAX_SCORE", 100)))
+PERCENTILES = (25, 50, 75, 90)
+
+# (class_id, date_from, date_to, marks version) -> ClassAnalytics
+analytics_cache = TTLCache(
+    maxsize=int(os.getenv("ANALYTICS_CACHE_MAX_SIZE", 500)),
+    ttl=float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", 300)),
+)
+
+
+# =========================================================
+# COMPUTATION (runs in a worker thread)
+# =========================================================
+def _ranking(averages: pd.Series):
+    """averages: student_id -> mean score. Highest average ranks 1."""
+    ranks = averages.rank(method="min", ascending=False).astype(int)
+    percentiles = averages.rank(method="max", pct=True) * 100
+    table = pd.DataFrame({"average": averages.round(2), "rank": ranks, "percentile": percentiles.round(2)})
+    table = table.sort_values(["rank", "average"], ascending=[True, False])
+    return [
+        schemas.StudentRank(student_id=int(student_id), average=float(average), rank=int(rank),
+                            percentile=float(percentile))
+        for student_id, average, rank, percentile in table.itertuples()
+    ]
+
+
+def _histogram(scores: np.ndarray):
+    counts, edges = np.histogram(np.clip(scores, *SCORE_RANGE), bins=HISTOGRAM_BINS, range=SCORE_RANGE)
+    return [
+        schemas.HistogramBin(lower=float(edges[i]), upper=float(edges[i + 1]), count=int(counts[i]))
+        for i in range(len(counts))
+    ]
+
+
+def compute_class_analytics(class_id: int, marks: pd.DataFrame, date_from: date = None, date_to: date = None):
+    """marks: one row per mark with student_id, subject_id, score columns."""
+    subjects = []
+    for subject_id, group in marks.groupby("subject_id", sort=True):
+        averages = group.groupby("student_id")["score"].mean()
+        quantiles = np.percentile(averages.to_numpy(), PERCENTILES)
+        subjects.append(schemas.SubjectAnalytics(
+            subject_id=int(subject_id),
+            marks_count=len(group),
+            mean=round(float(group["score"].mean()), 2),
+            percentiles={f"p{p}": round(float(q), 2) for p, q in zip(PERCENTILES, quantiles)},
+            histogram=_histogram(group["score"].to_numpy()),
+            ranking=_ranking(averages),
+        ))
+
+    overall = marks.groupby("student_id")["score"].mean() if len(marks) else pd.Series(dtype=float)
+    return schemas.ClassAnalytics(
+        class_id=class_id,
+        date_from=date_from,
+        date_to=date_to,
+        students_graded=int(marks["student_id"].nunique()) if len(marks) else 0,
+        subjects=subjects,
+        overall_ranking=_ranking(overall) if len(overall) else [],
+    )
+
+
+# =========================================================
+# ENTRY POINT
+# =========================================================
+async def get_class_analytics(db: AsyncSession, class_id: int, date_from: date = None, date_to: date = None):
+    """
+    Ranks, percentiles and score histograms per subject for one class.
+    Cached until the next marks write to the class bumps its version.
+    """
+    key = (class_id, date_from, date_to, class_marks_version.get(class_id, 0))
+    cached = analytics_cache.get(key)
+    if cached is not None:
+        return cached
+
+    stmt = (
+        select(model.Marks.student_id, model.Marks.subject_id, model.Marks.score)
+        .join(model.Student, model.Student.id == model.Marks.student_id)
+        .where(model.Student.class_id == class_id, model.Marks.is_active == True)
+    )
+    if date_from is not None:
+        stmt = stmt.where(model.Marks.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(model.Marks.date <= date_to)
+
+    result = await db.execute(stmt)
+    marks = pd.DataFrame(result.all(), columns=["student_id", "subject_id", "score"])
+
+    analytics = await asyncio.to_thread(compute_class_analytics, class_id, marks, date_from, date_to)
+    analytics_cache.set(key, analytics)
+    return analytics
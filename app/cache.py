@@ -0,0 +1,176 @@
+import os
+import time
+from collections import OrderedDict
+
+
+# =========================================================
+# TTL + LRU CACHE
+# =========================================================
+class TTLCache:
+    """
+    Small in-process cache with per-entry expiry and LRU eviction.
+    Not shared between workers: every entry is bounded by its TTL, so a
+    change made on another worker is picked up at most `ttl` seconds later.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def add(self, key, value, ttl: float = None):
+        """set() unless a live entry is already there; True if stored."""
+        item = self._data.get(key)
+        if item is not None and item[1] > time.monotonic():
+            return False
+        self.set(key, value, ttl)
+        return True
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_MISSING = object()
+
+
+# =========================================================
+# AUTH CACHES
+# =========================================================
+# token -> user id (decoded, signature-checked JWT)
+token_cache = TTLCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000)),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300)),
+)
+
+# user id -> detached User loaded by the auth dependency. Dropped on every
+# worker when the user changes (crud.user_changed); the short TTL bounds a
+# role or active-flag change whose broadcast was lost.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_MAX_SIZE", 10000)),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", 30)),
+)
+
+
+# =========================================================
+# AUTHORIZATION CACHES
+# =========================================================
+# teacher id -> crud.TeacherAccess (assigned class/subject pairs)
+teacher_access_cache = TTLCache(
+    maxsize=int(os.getenv("TEACHER_ACCESS_CACHE_MAX_SIZE", 10000)),
+    ttl=float(os.getenv("TEACHER_ACCESS_CACHE_TTL_SECONDS", 300)),
+)
+
+# student id -> class id, for students that have one
+student_class_cache = TTLCache(
+    maxsize=int(os.getenv("STUDENT_CLASS_CACHE_MAX_SIZE", 50000)),
+    ttl=float(os.getenv("STUDENT_CLASS_CACHE_TTL_SECONDS", 300)),
+)
+
+
+# =========================================================
+# NOTIFICATION CACHES
+# =========================================================
+# user id -> unread notification count. Fan-out and reads drop the entry on
+# every worker (crud.unread_changed) rather than adjust it, so workers never
+# disagree for longer than a broadcast takes.
+unread_cache = TTLCache(
+    maxsize=int(os.getenv("UNREAD_CACHE_MAX_SIZE", 50000)),
+    ttl=float(os.getenv("UNREAD_CACHE_TTL_SECONDS", 300)),
+)
+
+# bumped on every drop; a cache miss only stores its count if nothing was
+# dropped while it was counting, so it cannot undo a concurrent change
+_unread_drops = 0
+
+
+def drop_unread(user_ids):
+    global _unread_drops
+    _unread_drops += 1
+    for user_id in user_ids:
+        unread_cache.pop(user_id)
+
+
+def unread_drops():
+    return _unread_drops
+
+
+# =========================================================
+# ANALYTICS INVALIDATION
+# =========================================================
+# class id -> counter bumped on every marks write to that class, on every
+# worker (see crud.class_marks_changed); analytics results are cached under
+# the version they were computed at
+class_marks_version = {}
+
+
+def bump_class_marks_version(class_id: int):
+    class_marks_version[class_id] = class_marks_version.get(class_id, 0) + 1
+
+
+def invalidate_user(user_id: int):
+    user_cache.pop(user_id)
+
+
+# =========================================================
+# REFERENCE DATA (classes, subjects)
+# =========================================================
+# table -> counter bumped on every write to it, on every worker (see
+# crud.reference_changed); rendered list pages are cached under the version
+# they were rendered at. The TTL bounds staleness if a broadcast is lost.
+reference_version = {}
+
+# (table, query params, version) -> (JSON body, ETag)
+reference_cache = TTLCache(
+    maxsize=int(os.getenv("REFERENCE_CACHE_MAX_SIZE", 1000)),
+    ttl=float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", 300)),
+)
+
+
+def bump_reference_version(table: str):
+    reference_version[table] = reference_version.get(table, 0) + 1
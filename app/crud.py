@@ -1,30 +1,72 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
-from passlib.context import CryptContext
+from sqlalchemy import Integer, select, update, func, case, and_, or_, union, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload, noload, selectinload
 from datetime import date, datetime
 import asyncio
+import os
 from app import model, schemas
-
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto",
+from app.database import AsyncSessionLocal
+from app.pubsub import hub, NOTIFY_USER_BATCH
+from app.metrics import Timings
+from app.hashing import hasher
+from app.cache import (
+    invalidate_user, unread_cache, drop_unread, unread_drops,
+    bump_class_marks_version, bump_reference_version,
+    teacher_access_cache, student_class_cache,
 )
+
+MAX_PAGE_SIZE = 200
+FANOUT_CHUNK_SIZE = int(os.getenv("NOTIFICATION_FANOUT_CHUNK_SIZE", 1000))
+
+
+# =========================================================
+# PAGINATION
+# =========================================================
+async def paginate(db: AsyncSession, stmt, id_column, cursor: int = None,
+                   limit: int = 50, newest_first: bool = False):
+    """
+    Keyset pagination on `id_column`: fetch one row past `limit` to know
+    whether another page exists, and hand back the last id as the cursor.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor is not None:
+        stmt = stmt.where(id_column < cursor if newest_first else id_column > cursor)
+    stmt = stmt.order_by(id_column.desc() if newest_first else id_column).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    items = result.scalars().all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = items[-1].id
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _created_between(stmt, column, created_from: datetime = None, created_to: datetime = None):
+    if created_from is not None:
+        stmt = stmt.where(column >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(column < created_to)
+    return stmt
+
+
 # =========================================================
 # AUTH HELPERS
 # =========================================================
-def hash_password(password: str):
-    return pwd_context.hash(password)
+async def hash_password(password: str):
+    return await hasher.hash(password)
 
-def verify_password(plain: str, hashed: str):
-    return pwd_context.verify(plain, hashed)
+async def verify_password(plain: str, hashed: str):
+    return await hasher.verify(plain, hashed)
 
 
 # =========================================================
 # USERS CRUD
 # =========================================================
 async def create_user(db: AsyncSession, user_data: schemas.UserCreate):
-    hashed = hash_password(user_data.password)
+    hashed = await hash_password(user_data.password)
     new_user = model.User(
         name=user_data.name,
         email=user_data.email,
@@ -48,9 +90,139 @@ async def get_user(db: AsyncSession, user_id: int):
     return result.scalars().first()
 
 
-async def get_all_users(db: AsyncSession):
-    result = await db.execute(select(model.User))
-    return result.scalars().all()
+# Which profile each role needs; the other one is set to None without a query
+PROFILE_LOAD_OPTIONS = {
+    "student": (
+        joinedload(model.User.student_profile),
+        noload(model.User.teacher_profile),
+    ),
+    "teacher": (
+        joinedload(model.User.teacher_profile),
+        noload(model.User.student_profile),
+    ),
+    "admin": (
+        joinedload(model.User.teacher_profile),
+        noload(model.User.student_profile),
+    ),
+}
+
+
+async def get_user_with_profile(db: AsyncSession, user_id: int, role: str = None):
+    """
+    Load a user and the profile matching its role in a single query.
+    Without a role hint both profiles are joined.
+    """
+    options = PROFILE_LOAD_OPTIONS.get(role) or (
+        joinedload(model.User.student_profile),
+        joinedload(model.User.teacher_profile),
+    )
+    result = await db.execute(
+        select(model.User).where(model.User.id == user_id).options(*options)
+    )
+    user = result.scalars().first()
+
+    # role hint came from an older token, reload with the right profile
+    if user is not None and role is not None and user.role != role:
+        db.expunge(user)
+        return await get_user_with_profile(db, user_id, user.role)
+    return user
+
+
+async def get_all_users(db: AsyncSession, role: str = None, is_active: bool = None,
+                        created_from: datetime = None, created_to: datetime = None,
+                        cursor: int = None, limit: int = 50):
+    stmt = select(model.User)
+    if role is not None:
+        stmt = stmt.where(model.User.role == role)
+    if is_active is not None:
+        stmt = stmt.where(model.User.is_active == is_active)
+    stmt = _created_between(stmt, model.User.created_at, created_from, created_to)
+    return await paginate(db, stmt, model.User.id, cursor, limit)
+
+
+async def update_user(db: AsyncSession, user_id: int, data: schemas.UserUpdate):
+    user = await get_user(db, user_id)
+    if not user:
+        return None
+
+    for field, value in data.model_dump(exclude_unset=True).items():
+        setattr(user, field, value)
+
+    await db.commit()
+    await db.refresh(user)
+
+    # role / active flag feed the auth dependency, drop the cached principal
+    await user_changed(user_id)
+    return user
+
+
+async def user_changed(user_id: int):
+    """Drop the cached principal here at once, then on every worker through the hub."""
+    invalidate_user(user_id)
+    await hub.broadcast("user_changed", {"user_id": user_id})
+
+
+hub.on("user_changed", lambda data: invalidate_user(data["user_id"]))
+
+
+# =========================================================
+# BULK ONBOARDING (used by app.importer)
+# =========================================================
+async def insert_users_batch(db: AsyncSession, rows: list):
+    """
+    Multi-row INSERT of users, skipping emails that already exist.
+    Returns {email: id} for the rows actually inserted. The caller commits.
+    """
+    if not rows:
+        return {}
+    now = datetime.utcnow()
+    rows = [{**row, "is_active": True, "created_at": now, "updated_at": now} for row in rows]
+    stmt = (
+        _upsert_insert(db, model.User.__table__).values(rows)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(model.User.id, model.User.email)
+    )
+    result = await db.execute(stmt)
+    return {email: user_id for user_id, email in result.all()}
+
+
+async def insert_students_batch(db: AsyncSession, profiles: list):
+    """profiles: [(user_id, StudentBase)]"""
+    if not profiles:
+        return
+    now = datetime.utcnow()
+    await db.execute(_upsert_insert(db, model.Student.__table__).values([
+        {
+            "user_id": user_id, "class_id": p.class_id, "age": p.age, "sex": p.sex,
+            "is_active": True, "created_at": now, "updated_at": now,
+        }
+        for user_id, p in profiles
+    ]))
+
+
+async def insert_teachers_batch(db: AsyncSession, profiles: list):
+    """profiles: [(user_id, TeacherUpdate)]; also links subject_ids."""
+    if not profiles:
+        return
+    now = datetime.utcnow()
+    result = await db.execute(
+        _upsert_insert(db, model.Teacher.__table__).values([
+            {
+                "user_id": user_id, "age": p.age, "sex": p.sex,
+                "is_active": True, "created_at": now, "updated_at": now,
+            }
+            for user_id, p in profiles
+        ]).returning(model.Teacher.id, model.Teacher.user_id)
+    )
+    teacher_ids = {user_id: teacher_id for teacher_id, user_id in result.all()}
+
+    links = [
+        {"teacher_id": teacher_ids[user_id], "subject_id": subject_id}
+        for user_id, p in profiles
+        for subject_id in set(p.subject_ids or ())
+    ]
+    if links:
+        await db.execute(_upsert_insert(db, model.teacher_subject_table).values(links))
 
 
 # =========================================================
@@ -78,38 +250,114 @@ async def get_student(db: AsyncSession, student_id: int):
     return result.scalars().first()
 
 
-async def get_students_by_class(db: AsyncSession, class_id: int):
-    result = await db.execute(
-        select(model.Student).where(model.Student.class_id == class_id)
+async def get_student_class_id(db: AsyncSession, student_id: int):
+    """Class of a student (None if unassigned or unknown), cached for authorization checks."""
+    class_id = student_class_cache.get(student_id)
+    if class_id is None:
+        class_id = await db.scalar(
+            select(model.Student.class_id).where(model.Student.id == student_id)
+        )
+        if class_id is not None:
+            student_class_cache.set(student_id, class_id)
+    return class_id
+
+
+async def get_students_by_class(db: AsyncSession, class_id: int, is_active: bool = None,
+                                cursor: int = None, limit: int = 50):
+    stmt = (
+        select(model.Student)
+        .where(model.Student.class_id == class_id)
+        .options(joinedload(model.Student.user))
     )
-    return result.scalars().all()
+    if is_active is not None:
+        stmt = stmt.where(model.Student.is_active == is_active)
+    return await paginate(db, stmt, model.Student.id, cursor, limit)
+
+
 
+async def _summary_section(timings: Timings, name: str, fetch, *args):
+    # own session -> own pooled connection, so sections really run in parallel
+    async with AsyncSessionLocal() as session:
+        with timings.span(name):
+            result = await session.execute(fetch(*args))
+            return result.all()
 
 
-async def get_student_summary(db: AsyncSession, user: model.User):
+# Column projections for the summary screen: no ORM entities, no unused columns
+def _summary_profile_query(student_id: int):
+    return (
+        select(
+            model.Student.id, model.User.name, model.User.email,
+            model.Student.class_id, model.Student.age, model.Student.sex,
+        )
+        .join(model.User, model.User.id == model.Student.user_id)
+        .where(model.Student.id == student_id)
+    )
+
+
+def _summary_marks_query(student_id: int):
+    return (
+        select(model.Marks.subject_id, model.Marks.score, model.Marks.date)
+        .where(model.Marks.student_id == student_id, model.Marks.is_active == True)
+        .order_by(model.Marks.date.desc())
+    )
+
+
+def _summary_attendance_query(student_id: int):
+    return (
+        select(model.Attendance.subject_id, model.Attendance.status, model.Attendance.date)
+        .where(model.Attendance.student_id == student_id, model.Attendance.is_active == True)
+        .order_by(model.Attendance.date.desc())
+    )
+
+
+def _summary_behavior_query(student_id: int):
+    return (
+        select(model.Behavior.remarks, model.Behavior.date)
+        .where(model.Behavior.student_id == student_id, model.Behavior.is_active == True)
+        .order_by(model.Behavior.date.desc())
+    )
+
+
+def _summary_notifications_query(user_id: int):
+    nr = model.NotificationRecipient
+    return (
+        select(
+            model.Notification.id, model.Notification.title, model.Notification.message,
+            model.Notification.type, nr.is_read, nr.created_at,
+        )
+        .join(nr, nr.notification_id == model.Notification.id)
+        .where(nr.user_id == user_id, nr.is_active == True)
+        .order_by(nr.created_at.desc())
+    )
+
+
+async def get_student_summary(user: model.User, timings: Timings = None):
     """
     Return profile, marks, attendance, behavior and notifications for a student.
+    Each section runs on its own pooled session, so latency is the slowest
+    section rather than the sum (at the cost of up to five connections per call).
     """
+    timings = timings if timings is not None else Timings()
     student_id = user.student_profile.id
 
-    profile_task = get_student(db, student_id)
-    marks_task = get_student_marks(db, student_id)
-    attendance_task = get_attendance(db, student_id)
-    behavior_task = get_behavior(db, student_id)
-    notifications_task = get_notifications_for_user(db, user)
+    with timings.span("total"):
+        profile, marks, attendance, behavior, notifications = await asyncio.gather(
+            _summary_section(timings, "profile", _summary_profile_query, student_id),
+            _summary_section(timings, "marks", _summary_marks_query, student_id),
+            _summary_section(timings, "attendance", _summary_attendance_query, student_id),
+            _summary_section(timings, "behavior", _summary_behavior_query, student_id),
+            _summary_section(timings, "notifications", _summary_notifications_query, user.id),
+        )
 
-    profile, marks, attendance, behavior, notifications = await asyncio.gather(
-        profile_task, marks_task, attendance_task, behavior_task, notifications_task
+    return schemas.StudentSummary(
+        profile=profile[0],
+        marks=marks,
+        attendance=attendance,
+        behavior=behavior,
+        notifications=notifications,
     )
 
-    return {
-        "profile": profile,
-        "marks": marks,
-        "attendance": attendance,
-        "behavior": behavior,
-        "notifications": notifications,
-    }
-
 
 # =========================================================
 # TEACHER CRUD
@@ -131,22 +379,35 @@ async def get_teacher(db: AsyncSession, teacher_id: int):
     result = await db.execute(
         select(model.Teacher)
         .where(model.Teacher.id == teacher_id)
-        .options(joinedload(model.Teacher.user))
+        .options(joinedload(model.Teacher.user), selectinload(model.Teacher.subjects))
     )
     return result.scalars().first()
 
 
+# =========================================================
+# REFERENCE DATA INVALIDATION
+# =========================================================
+async def reference_changed(table: str):
+    """
+    Bump the cached version of `table` on this worker straight away (so the
+    writer reads its own write), then on every worker through the hub.
+    """
+    bump_reference_version(table)
+    await hub.broadcast("reference_changed", {"table": table})
+
+
+hub.on("reference_changed", lambda data: bump_reference_version(data["table"]))
+
+
 # =========================================================
 # CLASS CRUD
 # =========================================================
 async def create_class(db: AsyncSession, data: schemas.ClassCreate):
-    new_class = model.Class(
-        name=data.name,
-        category=data.category
-    )
+    new_class = model.Class(name=data.name)
     db.add(new_class)
     await db.commit()
     await db.refresh(new_class)
+    await reference_changed("classes")
     return new_class
 
 
@@ -155,9 +416,12 @@ async def get_class(db: AsyncSession, class_id: int):
     return result.scalars().first()
 
 
-async def get_all_classes(db: AsyncSession):
-    result = await db.execute(select(model.Class))
-    return result.scalars().all()
+async def get_all_classes(db: AsyncSession, is_active: bool = None,
+                          cursor: int = None, limit: int = 50):
+    stmt = select(model.Class)
+    if is_active is not None:
+        stmt = stmt.where(model.Class.is_active == is_active)
+    return await paginate(db, stmt, model.Class.id, cursor, limit)
 
 
 # =========================================================
@@ -168,12 +432,16 @@ async def create_subject(db: AsyncSession, data: schemas.SubjectCreate):
     db.add(new_subject)
     await db.commit()
     await db.refresh(new_subject)
+    await reference_changed("subjects")
     return new_subject
 
 
-async def get_all_subjects(db: AsyncSession):
-    result = await db.execute(select(model.Subject))
-    return result.scalars().all()
+async def get_all_subjects(db: AsyncSession, is_active: bool = None,
+                           cursor: int = None, limit: int = 50):
+    stmt = select(model.Subject)
+    if is_active is not None:
+        stmt = stmt.where(model.Subject.is_active == is_active)
+    return await paginate(db, stmt, model.Subject.id, cursor, limit)
 
 
 # =========================================================
@@ -188,6 +456,7 @@ async def create_assignment(db: AsyncSession, data: schemas.ClassAssignmentCreat
     db.add(new_assignment)
     await db.commit()
     await db.refresh(new_assignment)
+    await teacher_access_changed(new_assignment.teacher_id)
     return new_assignment
 
 
@@ -198,9 +467,142 @@ async def get_teacher_assignments(db: AsyncSession, teacher_id: int):
     return result.scalars().all()
 
 
+async def is_teacher_assigned(db: AsyncSession, teacher_id: int, class_id: int, subject_id: int):
+    access = await get_teacher_access(db, teacher_id)
+    return access.teaches(class_id, subject_id)
+
+
+# =========================================================
+# TEACHER AUTHORIZATION INDEX
+# =========================================================
+class TeacherAccess:
+    """A teacher's assigned (class_id, subject_id) pairs, as sets for O(1) checks."""
+
+    __slots__ = ("pairs", "class_ids")
+
+    def __init__(self, pairs):
+        self.pairs = frozenset(pairs)
+        self.class_ids = frozenset(class_id for class_id, _ in self.pairs)
+
+    def teaches(self, class_id: int, subject_id: int = None):
+        """Assigned to the class for `subject_id`, or for any subject when it is None."""
+        if subject_id is None:
+            return class_id in self.class_ids
+        return (class_id, subject_id) in self.pairs
+
+
+async def get_teacher_access(db: AsyncSession, teacher_id: int):
+    access = teacher_access_cache.get(teacher_id)
+    if access is None:
+        result = await db.execute(
+            select(model.ClassAssignment.class_id, model.ClassAssignment.subject_id)
+            .where(model.ClassAssignment.teacher_id == teacher_id)
+        )
+        access = TeacherAccess(tuple(row) for row in result.all())
+        teacher_access_cache.set(teacher_id, access)
+    return access
+
+
+async def teacher_access_changed(teacher_id: int):
+    """Drop the teacher's cached index here at once, then on every worker through the hub."""
+    teacher_access_cache.pop(teacher_id)
+    await hub.broadcast("teacher_access_changed", {"teacher_id": teacher_id})
+
+
+hub.on("teacher_access_changed", lambda data: teacher_access_cache.pop(data["teacher_id"]))
+
+
+# =========================================================
+# BULK WRITE HELPERS
+# =========================================================
+def _upsert_insert(db: AsyncSession, table):
+    """INSERT construct with ON CONFLICT support for the session's dialect."""
+    if db.bind.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+async def _class_roster(db: AsyncSession, class_id: int, student_ids: list):
+    """Which of `student_ids` are active students of `class_id`."""
+    result = await db.execute(
+        select(model.Student.id).where(
+            model.Student.class_id == class_id,
+            model.Student.id.in_(student_ids),
+            model.Student.is_active == True,
+        )
+    )
+    return set(result.scalars().all())
+
+
+async def _bulk_upsert(db: AsyncSession, row_model, key_columns: list, update_columns: list,
+                       rows: list, rejected: list):
+    """
+    Write `rows` with a single multi-row INSERT ... ON CONFLICT DO UPDATE and
+    build the per-row outcome list. The caller commits.
+
+    Created vs updated comes from the upsert itself, not a read made
+    before it, so a concurrent submission of the same sheet can't skew the
+    counts: on Postgres xmax is 0 only for rows this statement inserted;
+    on SQLite an updated row keeps its original created_at.
+    """
+    results = list(rejected)
+    created = updated = 0
+
+    if rows:
+        if db.bind.dialect.name == "postgresql":
+            inserted = literal_column("xmax = 0")
+        else:
+            inserted = row_model.created_at == rows[0]["created_at"]
+        stmt = _upsert_insert(db, row_model.__table__).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={col: stmt.excluded[col] for col in update_columns},
+        ).returning(row_model.id, row_model.student_id, inserted)
+        written = await db.execute(stmt)
+
+        for row_id, student_id, was_inserted in written.all():
+            status = "created" if was_inserted else "updated"
+            if status == "created":
+                created += 1
+            else:
+                updated += 1
+            results.append(schemas.BulkRowResult(student_id=student_id, status=status, id=row_id))
+
+    return schemas.BulkWriteResult(
+        created=created, updated=updated, rejected=len(rejected), results=results
+    )
+
+
+def _split_entries(entries, roster: set):
+    """Drop entries for students outside the class or repeated in the payload."""
+    accepted, rejected, seen = [], [], set()
+    for entry in entries:
+        if entry.student_id not in roster:
+            rejected.append(schemas.BulkRowResult(
+                student_id=entry.student_id, status="rejected", detail="Student is not in this class"
+            ))
+        elif entry.student_id in seen:
+            rejected.append(schemas.BulkRowResult(
+                student_id=entry.student_id, status="rejected", detail="Duplicate entry for student"
+            ))
+        else:
+            seen.add(entry.student_id)
+            accepted.append(entry)
+    return accepted, rejected
+
+
 # =========================================================
 # MARKS CRUD
 # =========================================================
+async def class_marks_changed(class_id: int):
+    """Bump the class's analytics version here at once, then on every worker through the hub."""
+    bump_class_marks_version(class_id)
+    await hub.broadcast("class_marks_changed", {"class_id": class_id})
+
+
+hub.on("class_marks_changed", lambda data: bump_class_marks_version(data["class_id"]))
+
+
 async def add_marks(db: AsyncSession, data: schemas.MarksCreate):
     new_marks = model.Marks(
         student_id=data.student_id,
@@ -210,11 +612,53 @@ async def add_marks(db: AsyncSession, data: schemas.MarksCreate):
         date=data.date or date.today(),
     )
     db.add(new_marks)
+    await db.flush()
+    await refresh_marks_stats(db, new_marks.subject_id, [new_marks.student_id])
     await db.commit()
     await db.refresh(new_marks)
+
+    class_id = await get_student_class_id(db, new_marks.student_id)
+    if class_id is not None:
+        await class_marks_changed(class_id)
     return new_marks
 
 
+async def add_marks_bulk(db: AsyncSession, data: schemas.MarksBulkCreate, teacher_id: int):
+    """
+    Grade a whole class for one subject/date in one statement. Re-submitting
+    a sheet overwrites the earlier scores (ON CONFLICT on
+    unique_student_subject_date).
+    """
+    student_ids = [e.student_id for e in data.entries]
+    roster = await _class_roster(db, data.class_id, student_ids)
+    accepted, rejected = _split_entries(data.entries, roster)
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "student_id": e.student_id,
+            "subject_id": data.subject_id,
+            "teacher_id": teacher_id,
+            "score": e.score,
+            "date": data.date,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for e in accepted
+    ]
+    result = await _bulk_upsert(
+        db, model.Marks,
+        key_columns=["student_id", "subject_id", "date"],
+        update_columns=["score", "teacher_id", "is_active", "updated_at"],
+        rows=rows, rejected=rejected,
+    )
+    await refresh_marks_stats(db, data.subject_id, [e.student_id for e in accepted])
+    await db.commit()
+    await class_marks_changed(data.class_id)
+    return result
+
+
 async def get_student_marks(db: AsyncSession, student_id: int):
     result = await db.execute(
         select(model.Marks).where(model.Marks.student_id == student_id)
@@ -226,19 +670,64 @@ async def get_student_marks(db: AsyncSession, student_id: int):
 # ATTENDANCE CRUD
 # =========================================================
 async def mark_attendance(db: AsyncSession, data: schemas.AttendanceCreate):
-    new_att = model.Attendance(
+    """Upsert on unique_attendance, so a retried request updates instead of failing."""
+    now = datetime.utcnow()
+    stmt = _upsert_insert(db, model.Attendance).values(
         student_id=data.student_id,
         teacher_id=data.teacher_id,
         subject_id=data.subject_id,
         status=data.status,
-        date=data.date or date.today()
+        date=data.date or date.today(),
+        is_active=True,
+        created_at=now,
+        updated_at=now,
     )
-    db.add(new_att)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "subject_id", "date"],
+        set_={col: stmt.excluded[col] for col in ("status", "teacher_id", "is_active", "updated_at")},
+    ).returning(model.Attendance)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    new_att = result.scalars().one()
+    await refresh_attendance_stats(db, new_att.subject_id, [new_att.student_id])
     await db.commit()
-    await db.refresh(new_att)
     return new_att
 
 
+async def mark_attendance_bulk(db: AsyncSession, data: schemas.AttendanceRollCall, teacher_id: int):
+    """
+    Take roll for a whole class in one statement. Safe to retry: a repeated
+    roll call overwrites the earlier statuses (ON CONFLICT on unique_attendance).
+    """
+    student_ids = [e.student_id for e in data.entries]
+    roster = await _class_roster(db, data.class_id, student_ids)
+    accepted, rejected = _split_entries(data.entries, roster)
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "student_id": e.student_id,
+            "subject_id": data.subject_id,
+            "teacher_id": teacher_id,
+            "status": e.status,
+            "date": data.date,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for e in accepted
+    ]
+    result = await _bulk_upsert(
+        db, model.Attendance,
+        key_columns=["student_id", "subject_id", "date"],
+        update_columns=["status", "teacher_id", "is_active", "updated_at"],
+        rows=rows, rejected=rejected,
+    )
+    await refresh_attendance_stats(db, data.subject_id, [e.student_id for e in accepted])
+    await db.commit()
+    return result
+
+
 async def get_attendance(db: AsyncSession, student_id: int):
     result = await db.execute(
         select(model.Attendance).where(model.Attendance.student_id == student_id)
@@ -246,6 +735,99 @@ async def get_attendance(db: AsyncSession, student_id: int):
     return result.scalars().all()
 
 
+# =========================================================
+# STUDENT SUBJECT STATS
+# =========================================================
+async def _upsert_stats(db: AsyncSession, source, columns: list):
+    """INSERT ... SELECT `source` into student_subject_stats, overwriting `columns`."""
+    table = model.StudentSubjectStats.__table__
+    stmt = _upsert_insert(db, table).from_select(["student_id", "subject_id", *columns, "updated_at"], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "subject_id"],
+        set_={col: stmt.excluded[col] for col in [*columns, "updated_at"]},
+    )
+    await db.execute(stmt)
+
+
+def _marks_stats_source(*where):
+    return (
+        select(
+            model.Marks.student_id, model.Marks.subject_id,
+            func.count(model.Marks.score), func.coalesce(func.sum(model.Marks.score), 0),
+            func.now(),
+        )
+        .where(model.Marks.is_active == True, *where)
+        .group_by(model.Marks.student_id, model.Marks.subject_id)
+    )
+
+
+def _attendance_stats_source(*where):
+    present = func.sum(case((model.Attendance.status == model.AttendanceStatus.present, 1), else_=0))
+    return (
+        select(
+            model.Attendance.student_id, model.Attendance.subject_id,
+            func.count(model.Attendance.id), func.coalesce(present, 0),
+            func.now(),
+        )
+        .where(model.Attendance.is_active == True, *where)
+        .group_by(model.Attendance.student_id, model.Attendance.subject_id)
+    )
+
+
+async def _lock_stats(db: AsyncSession, subject_id: int, student_ids: list):
+    """
+    Take a transaction-scoped advisory lock per (student, subject) before
+    recomputing. Under READ COMMITTED two concurrent writers would each
+    aggregate without the other's uncommitted row, and the later upsert
+    would overwrite the total with a stale one; once the lock is held, the
+    recompute sees everything committed before it. Locks are taken in key
+    order so bulk writers cannot deadlock. SQLite serializes writers already.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+    keys = func.unnest(
+        postgresql.array(sorted(set(student_ids)), type_=Integer)
+    ).table_valued("student_id").render_derived()
+    await db.execute(select(func.pg_advisory_xact_lock(keys.c.student_id, subject_id)))
+
+
+async def refresh_marks_stats(db: AsyncSession, subject_id: int, student_ids: list):
+    """Recompute marks totals for just the (student, subject) pairs a write touched."""
+    if not student_ids:
+        return
+    await _lock_stats(db, subject_id, student_ids)
+    source = _marks_stats_source(
+        model.Marks.subject_id == subject_id, model.Marks.student_id.in_(student_ids)
+    )
+    await _upsert_stats(db, source, ["marks_count", "marks_total"])
+
+
+async def refresh_attendance_stats(db: AsyncSession, subject_id: int, student_ids: list):
+    if not student_ids:
+        return
+    await _lock_stats(db, subject_id, student_ids)
+    source = _attendance_stats_source(
+        model.Attendance.subject_id == subject_id, model.Attendance.student_id.in_(student_ids)
+    )
+    await _upsert_stats(db, source, ["attendance_count", "attendance_present"])
+
+
+async def rebuild_student_stats(db: AsyncSession):
+    """Full backfill from marks/attendance, for existing data or after bulk loads."""
+    await _upsert_stats(db, _marks_stats_source(), ["marks_count", "marks_total"])
+    await _upsert_stats(db, _attendance_stats_source(), ["attendance_count", "attendance_present"])
+    await db.commit()
+
+
+async def get_student_stats(db: AsyncSession, student_id: int):
+    result = await db.execute(
+        select(model.StudentSubjectStats)
+        .where(model.StudentSubjectStats.student_id == student_id)
+        .order_by(model.StudentSubjectStats.subject_id)
+    )
+    return result.scalars().all()
+
+
 # =========================================================
 # BEHAVIOR CRUD
 # =========================================================
@@ -275,13 +857,14 @@ async def get_behavior(db: AsyncSession, student_id: int):
 async def create_notification(db: AsyncSession, data: schemas.NotificationCreate):
     """Create notification for:
     - specific class
-    - or ALL classes
+    - or ALL users
+    Recipient rows are written afterwards by fan_out_notification.
     """
     new_notif = model.Notification(
         title=data.title,
         message=data.message,
         type=data.type,
-        target_class_id=data.target_class_id,  # None = ALL
+        class_id=data.class_id,  # None = ALL
     )
     db.add(new_notif)
     await db.commit()
@@ -289,28 +872,229 @@ async def create_notification(db: AsyncSession, data: schemas.NotificationCreate
     return new_notif
 
 
+def _audience_subquery(class_id: int = None):
+    """User ids a notification is delivered to."""
+    if class_id is None:
+        return (
+            select(model.User.id.label("user_id"))
+            .where(model.User.is_active == True)
+            .subquery()
+        )
+
+    # deactivated accounts are left out, as in the global audience
+    students = (
+        select(model.Student.user_id.label("user_id"))
+        .join(model.User, model.User.id == model.Student.user_id)
+        .where(
+            model.Student.class_id == class_id,
+            model.Student.is_active == True,
+            model.User.is_active == True,
+        )
+    )
+    teachers = (
+        select(model.Teacher.user_id.label("user_id"))
+        .join(model.ClassAssignment, model.ClassAssignment.teacher_id == model.Teacher.id)
+        .join(model.User, model.User.id == model.Teacher.user_id)
+        .where(
+            model.ClassAssignment.class_id == class_id,
+            model.ClassAssignment.is_active == True,
+            model.Teacher.is_active == True,
+            model.User.is_active == True,
+        )
+    )
+    return union(students, teachers).subquery()
+
+
+async def fan_out_notification(notification_id: int, chunk_size: int = FANOUT_CHUNK_SIZE):
+    """
+    Materialize one NotificationRecipient row per audience member, walking
+    the audience in user-id order and committing one multi-row INSERT per
+    chunk, then push the notification to connected streams. Runs as a
+    background task with its own session; safe to re-run because existing
+    (notification, user) pairs are skipped.
+    """
+    delivered = 0
+    async with AsyncSessionLocal() as db:
+        notif = await db.get(model.Notification, notification_id)
+        if notif is None:
+            return 0
+
+        event = schemas.NotificationRead.model_validate(notif).model_dump(mode="json")
+        audience = _audience_subquery(notif.class_id)
+        last_user_id = 0
+        while True:
+            result = await db.execute(
+                select(audience.c.user_id)
+                .where(audience.c.user_id > last_user_id)
+                .order_by(audience.c.user_id)
+                .limit(chunk_size)
+            )
+            user_ids = result.scalars().all()
+            if not user_ids:
+                break
+
+            rows = [
+                {
+                    "notification_id": notif.id,
+                    "user_id": user_id,
+                    "is_read": False,
+                    "is_active": True,
+                    "created_at": notif.created_at,
+                    "updated_at": notif.created_at,
+                }
+                for user_id in user_ids
+            ]
+            stmt = _upsert_insert(db, model.NotificationRecipient.__table__).values(rows)
+            inserted = await db.execute(
+                stmt.on_conflict_do_nothing(index_elements=["notification_id", "user_id"])
+                .returning(model.NotificationRecipient.user_id)
+            )
+            inserted_ids = inserted.scalars().all()
+            await db.commit()
+
+            # only rows actually inserted change an unread count
+            await unread_changed(inserted_ids)
+            await hub.publish(inserted_ids, event)
+
+            delivered += len(user_ids)
+            last_user_id = user_ids[-1]
+            if len(user_ids) < chunk_size:
+                break
+
+    return delivered
+
+
 async def get_notifications_for_user(db: AsyncSession, user: model.User):
-    """If notification has a target class:
-        - Only students of that class can see it
-       Else:
-        - Everyone sees
+    """Inbox read: a single lookup on idx_recipient_inbox, newest first."""
+    result = await db.execute(
+        select(model.Notification)
+        .join(model.NotificationRecipient,
+              model.NotificationRecipient.notification_id == model.Notification.id)
+        .where(
+            model.NotificationRecipient.user_id == user.id,
+            model.NotificationRecipient.is_active == True,
+        )
+        .order_by(model.NotificationRecipient.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+# =========================================================
+# INBOX
+# =========================================================
+async def unread_changed(user_ids):
+    """Drop cached unread counts here at once, then on every worker through the hub."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    drop_unread(user_ids)
+    for i in range(0, len(user_ids), NOTIFY_USER_BATCH):
+        await hub.broadcast("unread_changed", {"user_ids": user_ids[i:i + NOTIFY_USER_BATCH]})
+
+
+hub.on("unread_changed", lambda data: drop_unread(data["user_ids"]))
+
+
+async def get_unread_count(db: AsyncSession, user_id: int):
+    count = unread_cache.get(user_id)
+    if count is not None:
+        return count
+
+    drops = unread_drops()
+    result = await db.execute(
+        select(func.count(model.NotificationRecipient.id)).where(
+            model.NotificationRecipient.user_id == user_id,
+            model.NotificationRecipient.is_read == False,
+            model.NotificationRecipient.is_active == True,
+        )
+    )
+    count = result.scalar_one()
+    if unread_drops() == drops:
+        unread_cache.add(user_id, count)
+    return count
+
+
+async def get_inbox(db: AsyncSession, user_id: int, unread_only: bool = False,
+                    cursor: int = None, limit: int = 50):
     """
-    if user.role == "student":
-        result = await db.execute(
-            select(model.Notification)
-            .join(model.Student, model.Student.class_id == model.Notification.target_class_id)
-            .where(model.Student.user_id == user.id)
+    Newest-first inbox page. Keyset on (created_at, id) of the recipient row;
+    the cursor is the last recipient id of the previous page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    nr = model.NotificationRecipient
+    stmt = (
+        select(
+            nr.id, nr.notification_id, nr.is_read, nr.created_at,
+            model.Notification.title, model.Notification.message,
+            model.Notification.type, model.Notification.class_id,
+        )
+        .join(model.Notification, model.Notification.id == nr.notification_id)
+        .where(nr.user_id == user_id, nr.is_active == True)
+    )
+    if unread_only:
+        stmt = stmt.where(nr.is_read == False)
+    if cursor is not None:
+        last_created_at = select(nr.created_at).where(nr.id == cursor).scalar_subquery()
+        stmt = stmt.where(or_(
+            nr.created_at < last_created_at,
+            and_(nr.created_at == last_created_at, nr.id < cursor),
+        ))
+    stmt = stmt.order_by(nr.created_at.desc(), nr.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+async def mark_notification_read(db: AsyncSession, user_id: int, notification_id: int):
+    """Returns False when the user never received this notification."""
+    result = await db.execute(
+        select(model.NotificationRecipient.id, model.NotificationRecipient.is_read).where(
+            model.NotificationRecipient.user_id == user_id,
+            model.NotificationRecipient.notification_id == notification_id,
+            model.NotificationRecipient.is_active == True,
         )
-        class_specific = result.scalars().all()
+    )
+    row = result.first()
+    if row is None:
+        return False
+    if row.is_read:
+        return True
+
+    await db.execute(
+        update(model.NotificationRecipient)
+        .where(model.NotificationRecipient.id == row.id)
+        .values(is_read=True, updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    await unread_changed([user_id])
+    return True
 
-        result2 = await db.execute(
-            select(model.Notification).where(model.Notification.target_class_id == None)
+
+async def mark_all_notifications_read(db: AsyncSession, user_id: int):
+    await db.execute(
+        update(model.NotificationRecipient)
+        .where(
+            model.NotificationRecipient.user_id == user_id,
+            model.NotificationRecipient.is_read == False,
         )
-        global_notifs = result2.scalars().all()
+        .values(is_read=True, updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    await unread_changed([user_id])
 
-        return class_specific + global_notifs
 
-    else:
-        # teachers or admin see everything
-        result = await db.execute(select(model.Notification))
-        return result.scalars().all()
+async def get_all_notifications(db: AsyncSession, class_id: int = None, type: str = None,
+                                created_from: datetime = None, created_to: datetime = None,
+                                cursor: int = None, limit: int = 50):
+    """Admin view, newest first."""
+    stmt = select(model.Notification)
+    if class_id is not None:
+        stmt = stmt.where(model.Notification.class_id == class_id)
+    if type is not None:
+        stmt = stmt.where(model.Notification.type == type)
+    stmt = _created_between(stmt, model.Notification.created_at, created_from, created_to)
+    return await paginate(db, stmt, model.Notification.id, cursor, limit, newest_first=True)
@@ -1,6 +1,9 @@
 import os
+import time
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
 # ---------------------------------------------------------
@@ -27,13 +30,88 @@ if not DATABASE_URL:
 from app.model import Base as ModelBase
 Base = ModelBase
 
+# ---------------------------------------------------------
+# POOL CONFIG
+# ---------------------------------------------------------
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))  # 0 behind pgbouncer
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+
+
+# ---------------------------------------------------------
+# POOL METRICS
+# ---------------------------------------------------------
+class PoolStats:
+    """Checkout counters recorded by InstrumentedPool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float):
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long each checkout waits."""
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - started_at)
+
+
+def pool_status():
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+    }
+
+
 # ---------------------------------------------------------
 # ENGINE + SESSION
 # ---------------------------------------------------------
+connect_args = {}
+if DATABASE_URL.startswith("postgresql+asyncpg"):
+    connect_args = {
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,
-    pool_pre_ping=True,
+    echo=SQL_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -0,0 +1,133 @@
+import io
+import os
+import csv
+import enum
+from datetime import date
+
+from sqlalchemy import select, types
+
+from app import model
+from app.database import AsyncSessionLocal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet export is optional
+    pa = pq = None
+
+# =========================================================
+# CONFIG
+# =========================================================
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 5000))
+
+EXPORT_MODELS = {
+    "marks": model.Marks,
+    "attendance": model.Attendance,
+    "behavior": model.Behavior,
+}
+
+
+# =========================================================
+# SOURCE: SERVER-SIDE CURSOR
+# =========================================================
+async def _row_chunks(row_model, date_from: date = None, date_to: date = None):
+    """
+    Yield lists of rows straight off a server-side cursor, EXPORT_CHUNK_ROWS
+    at a time. Uses its own session so the stream outlives the request scope.
+    """
+    stmt = select(*row_model.__table__.columns).order_by(row_model.id)
+    if date_from is not None:
+        stmt = stmt.where(row_model.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(row_model.date <= date_to)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions():
+            yield rows
+
+
+def _plain(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+# =========================================================
+# CSV
+# =========================================================
+async def stream_csv(row_model, date_from: date = None, date_to: date = None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([c.name for c in row_model.__table__.columns])
+    yield buffer.getvalue()
+
+    async for rows in _row_chunks(row_model, date_from, date_to):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+
+
+# =========================================================
+# PARQUET
+# =========================================================
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever pyarrow wrote since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(column):
+    if isinstance(column.type, types.Enum):
+        return pa.string()
+    if isinstance(column.type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column.type, types.Integer):
+        return pa.int64()
+    if isinstance(column.type, types.DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, types.Date):
+        return pa.date32()
+    return pa.string()
+
+
+def parquet_available():
+    return pq is not None
+
+
+async def stream_parquet(row_model, date_from: date = None, date_to: date = None):
+    """One Parquet row group per cursor chunk, flushed to the client as it is written."""
+    columns = list(row_model.__table__.columns)
+    schema = pa.schema([pa.field(c.name, _arrow_type(c)) for c in columns])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in _row_chunks(row_model, date_from, date_to):
+            table = pa.table(
+                [[_plain(row[i]) for row in rows] for i in range(len(columns))],
+                schema=schema,
+            )
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
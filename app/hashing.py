@@ -0,0 +1,115 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from passlib.context import CryptContext
+
+# =========================================================
+# CONFIG
+# =========================================================
+# argon2-cffi releases the GIL while hashing, so a thread pool gives real
+# parallelism; "process" is available for hosts where that is not enough.
+HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", HASH_WORKERS * 2))
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+)
+
+
+# Module-level functions so they can be pickled into a process pool
+def _hash(password: str):
+    return pwd_context.hash(password)
+
+
+def _verify(plain: str, hashed: str):
+    return pwd_context.verify(plain, hashed)
+
+
+# =========================================================
+# PASSWORD HASHER
+# =========================================================
+class PasswordHasher:
+    """
+    Runs argon2 hashing/verification off the event loop in a bounded pool.
+    At most `max_concurrency` jobs are submitted at once; the rest wait on a
+    semaphore so a login storm queues here instead of inside the executor.
+    """
+
+    def __init__(self, executor: str = HASH_EXECUTOR, workers: int = HASH_WORKERS,
+                 max_concurrency: int = HASH_MAX_CONCURRENCY):
+        if executor not in ("thread", "process"):
+            raise ValueError("PASSWORD_HASH_EXECUTOR must be 'thread' or 'process'")
+        self.executor_kind = executor
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        # metrics
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="argon2"
+                )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.wait_seconds_total += started_at - queued_at
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._semaphore.release()
+            self.in_flight -= 1
+            self.completed += 1
+            self.run_seconds_total += time.perf_counter() - started_at
+
+    async def hash(self, password: str):
+        return await self._run(_hash, password)
+
+    async def verify(self, plain: str, hashed: str):
+        return await self._run(_verify, plain, hashed)
+
+    def stats(self):
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "completed": self.completed,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "run_seconds_total": round(self.run_seconds_total, 6),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hasher = PasswordHasher()
@@ -0,0 +1,208 @@
+"""
+Bulk onboarding of students/teachers from CSV.
+
+Expected columns:
+    students: name,email,password,age,sex,class_id
+    teachers: name,email,password,age,sex,subject_ids   (subject_ids like "1;4;7")
+
+CLI:
+    python -m app.importer students path/to/students.csv
+"""
+import os
+import csv
+import sys
+import uuid
+import asyncio
+from datetime import datetime
+
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app import crud, model, schemas
+from app.database import AsyncSessionLocal
+from app.hashing import hasher
+
+# =========================================================
+# CONFIG
+# =========================================================
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+MAX_REPORTED_ERRORS = 200
+
+
+# =========================================================
+# JOB STATUS
+# =========================================================
+class ImportJob:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"  # queued | running | done | failed
+        self.rows_read = 0
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    def error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+
+# In-process registry: poll the job on the worker that accepted the upload
+jobs = {}
+
+
+def create_job(kind: str):
+    job = ImportJob(kind)
+    jobs[job.id] = job
+    return job
+
+
+# =========================================================
+# ROW PARSING
+# =========================================================
+def _blank_to_none(value):
+    return value if value not in ("", None) else None
+
+
+def _parse_row(kind: str, row: dict):
+    """Validate one CSV row with the API schemas. Returns (UserCreate, profile)."""
+    user = schemas.UserCreate(
+        name=row.get("name"),
+        email=row.get("email"),
+        password=row.get("password"),
+        role=kind.rstrip("s"),
+    )
+    if kind == "students":
+        profile = schemas.StudentBase(
+            age=_blank_to_none(row.get("age")),
+            sex=_blank_to_none(row.get("sex")),
+            class_id=_blank_to_none(row.get("class_id")),
+        )
+    else:
+        subject_ids = [s for s in (row.get("subject_ids") or "").split(";") if s.strip()]
+        profile = schemas.TeacherUpdate(
+            age=_blank_to_none(row.get("age")),
+            sex=_blank_to_none(row.get("sex")),
+            subject_ids=subject_ids,
+        )
+    return user, profile
+
+
+def _validation_message(exc: ValidationError):
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+
+
+# =========================================================
+# BATCH LOADING
+# =========================================================
+async def _load_batch(kind: str, batch: list, job: ImportJob, known_ids: set, seen_emails: set):
+    """
+    batch: [(line, UserCreate, profile)]. seen_emails spans the whole file:
+    a repeated email would insert one user and then two profiles for it.
+    """
+    accepted = []
+    for line, user, profile in batch:
+        if user.email in seen_emails:
+            job.error(line, "duplicate email in file")
+        elif kind == "students" and profile.class_id is not None and profile.class_id not in known_ids:
+            job.error(line, f"class_id {profile.class_id} does not exist")
+        elif kind == "teachers" and not set(profile.subject_ids or ()) <= known_ids:
+            job.error(line, "subject_ids reference unknown subjects")
+        else:
+            seen_emails.add(user.email)
+            accepted.append((line, user, profile))
+    if not accepted:
+        return
+
+    # argon2 runs in the hashing pool, many rows in parallel
+    hashes = await asyncio.gather(*(hasher.hash(user.password) for _, user, _ in accepted))
+
+    async with AsyncSessionLocal() as db:
+        user_ids = await crud.insert_users_batch(db, [
+            {"name": user.name, "email": user.email, "password": hashed, "role": user.role}
+            for (_, user, _), hashed in zip(accepted, hashes)
+        ])
+
+        profiles = []
+        for line, user, profile in accepted:
+            if user.email not in user_ids:
+                job.skipped += 1  # email already registered
+                continue
+            profiles.append((user_ids[user.email], profile))
+
+        if kind == "students":
+            await crud.insert_students_batch(db, profiles)
+        else:
+            await crud.insert_teachers_batch(db, profiles)
+        await db.commit()
+
+    job.created += len(profiles)
+
+
+async def _known_ids(kind: str):
+    reference = model.Class if kind == "students" else model.Subject
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(reference.id))
+        return set(result.scalars().all())
+
+
+async def run_import(job: ImportJob, path: str, delete_after: bool = False):
+    """Stream the CSV at `path` into the database in IMPORT_BATCH_SIZE batches."""
+    job.status = "running"
+    try:
+        known_ids = await _known_ids(job.kind)
+        seen_emails = set()
+        batch = []
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            for line, row in enumerate(csv.DictReader(fh), start=2):
+                job.rows_read += 1
+                try:
+                    user, profile = _parse_row(job.kind, row)
+                except ValidationError as exc:
+                    job.error(line, _validation_message(exc))
+                    continue
+
+                batch.append((line, user, profile))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await _load_batch(job.kind, batch, job, known_ids, seen_emails)
+                    batch = []
+
+        if batch:
+            await _load_batch(job.kind, batch, job, known_ids, seen_emails)
+        job.status = "done"
+    except Exception as exc:
+        job.status = "failed"
+        job.error(0, f"{type(exc).__name__}: {exc}")
+    finally:
+        job.finished_at = datetime.utcnow()
+        if delete_after:
+            os.unlink(path)
+    return job
+
+
+# =========================================================
+# CLI
+# =========================================================
+async def _main(kind: str, path: str):
+    job = create_job(kind)
+    task = asyncio.create_task(run_import(job, path))
+    while not task.done():
+        await asyncio.sleep(1)
+        print(f"⏳ {job.rows_read} rows read, {job.created} created, {job.skipped} skipped, {job.failed} failed")
+    await task
+    hasher.shutdown()
+
+    print(f"{'✅' if job.status == 'done' else '❌'} Import {job.status}: "
+          f"{job.created} created, {job.skipped} skipped, {job.failed} failed")
+    for err in job.errors:
+        print(f"  line {err['line']}: {err['error']}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("students", "teachers"):
+        sys.exit("usage: python -m app.importer {students|teachers} FILE.csv")
+    asyncio.run(_main(sys.argv[1], sys.argv[2]))
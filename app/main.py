@@ -1,10 +1,21 @@
 import asyncio
-from fastapi import FastAPI
+import secrets
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.exc import OperationalError
 
-from app.database import engine
-from app.model import Base
+from app.analytics import analytics_cache
+from app.cache import (
+    token_cache, user_cache, unread_cache, reference_cache, teacher_access_cache, student_class_cache,
+)
+from app.database import engine, pool_status
+from app.hashing import hasher
+from app.metrics import METRICS_TOKEN, MetricsMiddleware, instrument_engine, registry
+from app.migrate import check_schema
+from app.profiling import ProfilingMiddleware
+from app.pubsub import hub
 from app.routers import auth, admin, students, teachers, notifications
 
 # =========================================================
@@ -27,18 +38,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# =========================================================
+# PROFILING + METRICS (metrics outermost, so it times everything below it)
+# =========================================================
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+registry.add_collector("db_pool", pool_status)
+registry.add_collector("password_hasher", hasher.stats)
+registry.add_collector("notification_streams", hub.stats)
+registry.add_collector("token_cache", token_cache.stats)
+registry.add_collector("user_cache", user_cache.stats)
+registry.add_collector("teacher_access_cache", teacher_access_cache.stats)
+registry.add_collector("student_class_cache", student_class_cache.stats)
+registry.add_collector("unread_cache", unread_cache.stats)
+registry.add_collector("analytics_cache", analytics_cache.stats)
+registry.add_collector("reference_cache", reference_cache.stats)
+
 # =========================================================
 # ROUTERS
 # =========================================================
-app.include_router(auth.router, prefix="/auth", tags=["Auth"])
-app.include_router(admin.router, prefix="/admin", tags=["Admin"])
-app.include_router(students.router, prefix="/students", tags=["Students"])
-app.include_router(teachers.router, prefix="/teachers", tags=["Teachers"])
-app.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
+app.include_router(auth.router)
+app.include_router(admin.router)
+app.include_router(students.router)
+app.include_router(teachers.router)
+app.include_router(notifications.router)
 
 # =========================================================
-# STARTUP: WAIT FOR DB + CREATE TABLES
+# STARTUP: WAIT FOR DB + CHECK SCHEMA VERSION
 # =========================================================
+# Tables are created and altered by `python -m app.migrate`, never here:
+# workers only refuse to start against a schema they were not built for.
 @app.on_event("startup")
 async def startup():
     max_retries = 20
@@ -46,12 +77,11 @@ async def startup():
 
     for attempt in range(1, max_retries + 1):
         try:
-            async with engine.begin() as conn:
-                # DEV ONLY (remove in prod, use Alembic)
-                await conn.run_sync(Base.metadata.create_all)
+            revision = await check_schema()
 
-                print("✅ Database connected & tables ready")
-                return
+            print(f"✅ Database connected, schema at revision {revision}")
+            await hub.start()
+            return
         except OperationalError:
             print(f"⏳ Database not ready (attempt {attempt}/{max_retries})")
             await asyncio.sleep(delay)
@@ -63,7 +93,9 @@ async def startup():
 # =========================================================
 @app.on_event("shutdown")
 async def shutdown():
+    await hub.stop()
     await engine.dispose()
+    hasher.shutdown()
     print("🔌 Database connection closed")
 
 # =========================================================
@@ -72,3 +104,16 @@ async def shutdown():
 @app.get("/")
 async def root():
     return {"message": "Welcome to School Management API!"}
+
+
+# =========================================================
+# METRICS (Prometheus text format, this worker only)
+# =========================================================
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    # closed unless METRICS_TOKEN is set: latencies and pool internals aren't public
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (set METRICS_TOKEN)")
+    if not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
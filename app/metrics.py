@@ -0,0 +1,243 @@
+import os
+import time
+import logging
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Same statement this many times in one request -> N+1 warning
+N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", 10))
+# /metrics requires "Authorization: Bearer <token>"; unset, it answers 404
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+# =========================================================
+# PER-REQUEST TIMINGS
+# =========================================================
+class Timings:
+    """Named spans for one request, rendered as a Server-Timing header."""
+
+    def __init__(self):
+        self.spans = {}
+
+    @contextmanager
+    def span(self, name: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = self.spans.get(name, 0.0) + time.perf_counter() - started_at
+
+    def server_timing(self):
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items())
+
+
+# =========================================================
+# PROMETHEUS-STYLE METRICS (per process)
+# =========================================================
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for label_values, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(names, label_values + (bound,))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(names, label_values + ('+Inf',))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, prefix: str, collect):
+        """collect() -> dict of numbers, exported as gauges named <prefix>_<key>."""
+        self.collectors.append((prefix, collect))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        for prefix, collect in self.collectors:
+            for key, value in collect().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "Requests by route and status.", ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to last response byte.", LATENCY_BUCKETS, ("method", "route")))
+db_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", QUERY_COUNT_BUCKETS, ("method", "route")))
+db_time = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.", LATENCY_BUCKETS, ("method", "route")))
+n_plus_one = registry.register(Counter(
+    "http_request_n_plus_one_total", "Requests that repeated one statement N_PLUS_ONE_THRESHOLD+ times.",
+    ("method", "route")))
+
+
+# =========================================================
+# SQL HOOKS
+# =========================================================
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = _Tally()
+
+
+# Set by the middleware; tasks spawned by the request (asyncio.gather) share it
+current_request = ContextVar("current_request", default=None)
+
+
+def instrument_engine(engine):
+    """Count and time every statement against the request that issued it."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            stats.statements[statement] += 1
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started_at") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+# =========================================================
+# MIDDLEWARE
+# =========================================================
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: per-route latency, status, query count and DB time.
+    Recorded when the last body chunk is sent, so background tasks are not
+    billed to the request. Adds a `db` entry to Server-Timing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started_at = time.perf_counter()
+        state = {"status": 500, "recorded": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", f'db;desc="{stats.queries} queries";dur={stats.db_seconds * 1000:.1f}'
+                )
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                self._record(scope, state, started_at, stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._record(scope, state, started_at, stats)  # errors, disconnects
+            current_request.reset(token)
+
+    @staticmethod
+    def _record(scope, state, started_at, stats):
+        if state["recorded"]:
+            return
+        state["recorded"] = True
+
+        route = scope.get("route")
+        labels = (scope["method"], route.path if route is not None else "unmatched")
+        http_requests.inc(*labels, state["status"])
+        http_latency.observe(time.perf_counter() - started_at, *labels)
+        db_queries.observe(stats.queries, *labels)
+        db_time.observe(stats.db_seconds, *labels)
+
+        if stats.statements:
+            statement, count = stats.statements.most_common(1)[0]
+            if count >= N_PLUS_ONE_THRESHOLD:
+                n_plus_one.inc(*labels)
+                logger.warning("Possible N+1 on %s %s: %d x %s", *labels, count, " ".join(statement.split())[:300])
@@ -0,0 +1,104 @@
+"""
+Schema migrations (Alembic, revisions in alembic/versions).
+
+    python -m app.migrate            upgrade the database to the latest revision
+    python -m app.migrate check      exit 1 unless the database is at the latest revision
+
+Run once per deploy, before the API workers start; the workers themselves
+only compare the database revision with the code's at startup.
+"""
+import os
+import sys
+import asyncio
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+from app.database import engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Databases built by create_all before migrations existed match this revision
+BASELINE_REVISION = "0001"
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def alembic_config():
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    return config
+
+
+def head_revision():
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def _inspect_schema(sync_conn):
+    """(current alembic revision, whether the app's tables already exist)"""
+    revision = MigrationContext.configure(sync_conn).get_current_revision()
+    return revision, inspect(sync_conn).has_table("users")
+
+
+async def current_revision():
+    async with engine.connect() as conn:
+        revision, _ = await conn.run_sync(_inspect_schema)
+    return revision
+
+
+# =========================================================
+# STARTUP CHECK (API workers)
+# =========================================================
+async def check_schema():
+    """Raise SchemaVersionError unless the database is at the code's head revision."""
+    current, head = await current_revision(), head_revision()
+    if current != head:
+        raise SchemaVersionError(
+            f"❌ Database schema is at revision {current or 'none'}, code expects {head}. "
+            f"Run `python -m app.migrate` first."
+        )
+    return current
+
+
+# =========================================================
+# MIGRATE (deploy step)
+# =========================================================
+async def _schema_state():
+    try:
+        async with engine.connect() as conn:
+            return await conn.run_sync(_inspect_schema)
+    finally:
+        await engine.dispose()
+
+
+def upgrade():
+    config = alembic_config()
+    revision, has_tables = asyncio.run(_schema_state())
+    if revision is None and has_tables:
+        print(f"📌 Existing unversioned schema: stamping baseline revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+    print(f"✅ Database at revision {head_revision()}")
+
+
+def check():
+    revision, _ = asyncio.run(_schema_state())
+    head = head_revision()
+    print(f"Database revision: {revision or 'none'} (head: {head})")
+    return revision == head
+
+
+if __name__ == "__main__":
+    action = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if action == "upgrade":
+        upgrade()
+    elif action == "check":
+        sys.exit(0 if check() else 1)
+    else:
+        sys.exit("usage: python -m app.migrate [upgrade|check]")
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, ForeignKey, Enum, Boolean, Date,
-    Time, DateTime, UniqueConstraint, Index, Table
+    Time, DateTime, UniqueConstraint, Index, Table, text
 )
 from sqlalchemy.orm import relationship, declarative_base
 import enum
@@ -54,7 +54,7 @@ class NotificationType(str, enum.Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     email = Column(String(150), unique=True, index=True, nullable=False)
     password = Column(String(255), nullable=False)
@@ -76,7 +76,7 @@ class User(Base):
 class Class(Base):
     __tablename__ = "classes"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(50), nullable=False, unique=True)  
     # Example of values:
     # Class 1, Class 10, Class 11 Arts, Class 12 Commerce etc.
@@ -90,8 +90,6 @@ class Class(Base):
     assignments = relationship("ClassAssignment", back_populates="class_")
     notifications = relationship("Notification", back_populates="class_")
 
-    __table_args__ = (Index("idx_class_name", "name"),)
-
 
 # =========================================================
 # SUBJECT
@@ -100,7 +98,7 @@ class Class(Base):
 class Subject(Base):
     __tablename__ = "subjects"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False, unique=True)
     is_active = Column(Boolean, default=True)
 
@@ -128,8 +126,14 @@ teacher_subject_table = Table(
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # class roster pages (keyset on id) and analytics joins
+        Index("idx_student_class", "class_id", "id"),
+        # notification audience: active students of a class
+        Index("idx_student_class_active", "class_id", "user_id", postgresql_where=text("is_active")),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
     class_id = Column(Integer, ForeignKey("classes.id"))
 
@@ -154,7 +158,7 @@ class Student(Base):
 class Teacher(Base):
     __tablename__ = "teachers"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
     age = Column(Integer)
     sex = Column(Enum(SexEnum))
@@ -178,7 +182,7 @@ class Teacher(Base):
 class Schedule(Base):
     __tablename__ = "schedules"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     day = Column(Enum(DayEnum), nullable=False)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
@@ -196,8 +200,14 @@ class Schedule(Base):
 
 class ClassAssignment(Base):
     __tablename__ = "class_assignments"
+    __table_args__ = (
+        # "is this teacher assigned to class X / subject Y" checks
+        Index("idx_assignment_teacher", "teacher_id", "class_id", "subject_id"),
+        # notification audience: teachers of a class
+        Index("idx_assignment_class", "class_id", "teacher_id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     teacher_id = Column(Integer, ForeignKey("teachers.id"))
     class_id = Column(Integer, ForeignKey("classes.id"))
     subject_id = Column(Integer, ForeignKey("subjects.id"))
@@ -219,7 +229,7 @@ class ClassAssignment(Base):
 class AssignmentSchedule(Base):
     __tablename__ = "assignment_schedules"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     assignment_id = Column(Integer, ForeignKey("class_assignments.id"))
     schedule_id = Column(Integer, ForeignKey("schedules.id"))
     is_active = Column(Boolean, default=True)
@@ -239,9 +249,10 @@ class Marks(Base):
     __tablename__ = "marks"
     __table_args__ = (
         UniqueConstraint("student_id", "subject_id", "date", name="unique_student_subject_date"),
+        Index("idx_marks_student_date", "student_id", text("date DESC"), postgresql_where=text("is_active")),
     )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey("students.id"))
     subject_id = Column(Integer, ForeignKey("subjects.id"))
     teacher_id = Column(Integer, ForeignKey("teachers.id"))
@@ -264,9 +275,10 @@ class Attendance(Base):
     __tablename__ = "attendance"
     __table_args__ = (
         UniqueConstraint("student_id", "subject_id", "date", name="unique_attendance"),
+        Index("idx_attendance_student_date", "student_id", text("date DESC"), postgresql_where=text("is_active")),
     )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey("students.id"))
     teacher_id = Column(Integer, ForeignKey("teachers.id"))
     subject_id = Column(Integer, ForeignKey("subjects.id"))
@@ -281,14 +293,39 @@ class Attendance(Base):
     teacher = relationship("Teacher", back_populates="attendance")
 
 
+# =========================================================
+# STUDENT SUBJECT STATS (maintained aggregate)
+# =========================================================
+
+class StudentSubjectStats(Base):
+    """
+    Per student/subject totals, refreshed by crud whenever marks or
+    attendance for that pair are written.
+    """
+    __tablename__ = "student_subject_stats"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), primary_key=True)
+
+    marks_count = Column(Integer, nullable=False, default=0)
+    marks_total = Column(Integer, nullable=False, default=0)
+    attendance_count = Column(Integer, nullable=False, default=0)
+    attendance_present = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # =========================================================
 # BEHAVIOR
 # =========================================================
 
 class Behavior(Base):
     __tablename__ = "behavior"
+    __table_args__ = (
+        Index("idx_behavior_student_date", "student_id", text("date DESC"), postgresql_where=text("is_active")),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey("students.id"))
     teacher_id = Column(Integer, ForeignKey("teachers.id"))
     remarks = Column(String(500))
@@ -308,8 +345,12 @@ class Behavior(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # admin list filtered by class, newest first
+        Index("idx_notification_class", "class_id", "id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     title = Column(String(200))
     message = Column(String(1000))
     type = Column(Enum(NotificationType))
@@ -333,13 +374,22 @@ class Notification(Base):
 
 class NotificationRecipient(Base):
     __tablename__ = "notification_recipients"
+    __table_args__ = (
+        UniqueConstraint("notification_id", "user_id", name="unique_notification_recipient"),
+        # inbox pages: newest first, keyset on (created_at, id)
+        Index("idx_recipient_inbox", "user_id", text("created_at DESC"), text("id DESC")),
+        # unread counter: only unread rows are indexed
+        Index("idx_recipient_unread", "user_id",
+              postgresql_where=text("NOT is_read AND is_active")),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     notification_id = Column(Integer, ForeignKey("notifications.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
     is_read = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
 
+    # copied from the notification so the inbox index orders by it
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -0,0 +1,166 @@
+"""
+Opt-in sampling profiler for live traffic (pyinstrument, optional dependency).
+
+A request is profiled when profiling is switched on (PUT /admin/profile)
+and it falls in the sampled fraction, or when an admin sends
+`X-Profile: 1`. Only one request is profiled at a time per worker; the
+rest of the traffic runs untouched. Finished profiles live in a per-worker
+ring buffer and render as speedscope JSON (flamegraphs), HTML or text.
+
+pyinstrument runs in async mode, so time a request spends awaiting, such as
+argon2 in the hashing pool or SQL on asyncpg, shows up under the awaiting
+frame. Pydantic validation and serialization run on the event loop and are
+sampled directly.
+"""
+import os
+import time
+import uuid
+import random
+from collections import deque
+from datetime import datetime
+
+from starlette.datastructures import MutableHeaders
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer, SpeedscopeRenderer
+except ImportError:  # profiling is optional
+    Profiler = None
+
+# =========================================================
+# CONFIG
+# =========================================================
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.01))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", 0.001))
+PROFILE_MAX_SAMPLES = int(os.getenv("PROFILE_MAX_SAMPLES", 50))
+PROFILE_HEADER = "x-profile"
+
+
+def profiler_available():
+    return Profiler is not None
+
+
+# =========================================================
+# STORED PROFILES
+# =========================================================
+class ProfileSample:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.route = None
+        self.status = None
+        self.duration_ms = None
+        self.started_at = datetime.utcnow()
+        self.session = None
+
+    def render(self, format: str):
+        if format == "speedscope":
+            return SpeedscopeRenderer().render(self.session)
+        if format == "html":
+            return HTMLRenderer().render(self.session)
+        return ConsoleRenderer(unicode=True, color=False, show_all=False).render(self.session)
+
+
+class ProfilerState:
+    """Per-worker switch, sampling rate and ring buffer of finished profiles."""
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = PROFILE_SAMPLE_RATE
+        self.route_prefix = None
+        self.samples = deque(maxlen=PROFILE_MAX_SAMPLES)
+        self.busy = False
+
+    def configure(self, enabled: bool, sample_rate: float = None, route_prefix: str = None):
+        self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        self.route_prefix = route_prefix
+
+    def get(self, sample_id: str):
+        return next((s for s in self.samples if s.id == sample_id), None)
+
+    async def should_sample(self, scope):
+        """
+        Decide whether to profile this request. A True answer claims `busy`
+        for the caller, which releases it when the profile is stored; it is
+        claimed before the admin lookup awaits, so concurrent requests can't
+        both start a profiler.
+        """
+        if self.busy or not profiler_available():
+            return False
+        self.busy = True
+        sampled = False
+        try:
+            if await _forced_by_admin(scope):
+                sampled = True
+            elif self.enabled and (not self.route_prefix or scope["path"].startswith(self.route_prefix)):
+                sampled = random.random() < self.sample_rate
+            return sampled
+        finally:
+            if not sampled:
+                self.busy = False
+
+
+profiler_state = ProfilerState()
+
+
+async def _forced_by_admin(scope):
+    """
+    X-Profile: 1 from an active admin. The user is resolved like the admin
+    dependencies do (user_cache, then the database), so a deactivated or
+    demoted admin loses this with the rest of the admin surface.
+    """
+    headers = dict(scope["headers"])
+    if headers.get(PROFILE_HEADER.encode()) != b"1":
+        return False
+    authorization = headers.get(b"authorization", b"").decode()
+    if not authorization.lower().startswith("bearer "):
+        return False
+
+    # avoid an import cycle through the routers
+    from app.database import AsyncSessionLocal
+    from app.routers.auth import resolve_user
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await resolve_user(authorization[7:], db)
+    except Exception:
+        return False
+    return user.is_active and user.role == "admin"
+
+
+# =========================================================
+# MIDDLEWARE
+# =========================================================
+class ProfilingMiddleware:
+    """Pure ASGI middleware; returns the profile id in X-Profile-Id."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await profiler_state.should_sample(scope):
+            await self.app(scope, receive, send)
+            return
+
+        sample = ProfileSample(scope["method"], scope["path"])
+        profiler = Profiler(interval=PROFILE_INTERVAL_SECONDS, async_mode="enabled")
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                sample.status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", sample.id)
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sample.session = profiler.stop()
+            sample.duration_ms = round((time.perf_counter() - started_at) * 1000, 1)
+            route = scope.get("route")
+            sample.route = route.path if route is not None else None
+            profiler_state.samples.append(sample)
+            profiler_state.busy = False
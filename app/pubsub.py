@@ -0,0 +1,241 @@
+import os
+import json
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# CONFIG
+# =========================================================
+PUBSUB_BACKEND = os.getenv("NOTIFICATION_PUBSUB_BACKEND", "memory")  # memory | postgres
+PUBSUB_CHANNEL = os.getenv("NOTIFICATION_PUBSUB_CHANNEL", "school_notifications")
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", 100))
+
+# NOTIFY payloads are capped at 8000 bytes, so recipients are sent in slices:
+# fan-out slices are sized by encoded length, id-only broadcasts by count
+NOTIFY_PAYLOAD_BYTES = 7900
+NOTIFY_USER_BATCH = 500
+RECONNECT_MAX_DELAY_SECONDS = 30
+
+
+# =========================================================
+# BACKENDS
+# =========================================================
+def _encode(message: dict) -> str:
+    # UTF-8 rather than \uXXXX escapes: a Devanagari character is 3 bytes, not 6
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+def publish_payloads(user_ids, event: dict):
+    """
+    Split a fan-out into NOTIFY payloads of {"user_ids", "event"}, each under
+    NOTIFY_PAYLOAD_BYTES once encoded. Raises ValueError if the event alone
+    does not fit.
+    """
+    room = NOTIFY_PAYLOAD_BYTES - len(_encode({"user_ids": [], "event": event}).encode())
+    chunk, size = [], 0
+    for user_id in user_ids:
+        cost = len(str(user_id)) + (1 if chunk else 0)  # the id plus its comma
+        if chunk and size + cost > room:
+            yield _encode({"user_ids": chunk, "event": event})
+            chunk, size, cost = [], 0, len(str(user_id))
+        if cost > room:
+            raise ValueError(f"Event does not fit in a {NOTIFY_PAYLOAD_BYTES}-byte NOTIFY payload")
+        chunk.append(user_id)
+        size += cost
+    if chunk:
+        yield _encode({"user_ids": chunk, "event": event})
+
+
+class InProcessBackend:
+    """Delivers only to subscribers connected to this worker."""
+
+    async def start(self, hub):
+        self.hub = hub
+
+    async def publish(self, user_ids, event: dict):
+        self.hub.deliver(user_ids, event)
+
+    async def broadcast(self, topic: str, data: dict):
+        self.hub.dispatch(topic, data)
+
+    async def stop(self):
+        pass
+
+
+class PostgresBackend:
+    """
+    Broadcasts through Postgres LISTEN/NOTIFY so every uvicorn worker (and
+    every container) delivers to its own connected subscribers. A dropped
+    connection is re-opened and re-LISTENed in the background (and on the
+    next publish); messages sent while it was down are not replayed.
+    """
+
+    def __init__(self, dsn: str, channel: str = PUBSUB_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self._reconnect_task = None
+
+    async def start(self, hub):
+        self.hub = hub
+        self._stopping = False
+        await self._connect()
+
+    async def _connect(self):
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        conn.add_termination_listener(self._on_terminated)
+        await conn.add_listener(self.channel, self._on_notify)
+        self._conn = conn
+
+    def _on_terminated(self, conn):
+        if self._stopping or conn is not self._conn:
+            return
+        logger.warning("Pub/sub connection on %s lost, reconnecting", self.channel)
+        self._conn = None
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1
+        while not self._stopping:
+            try:
+                async with self._lock:
+                    if self._conn is None:
+                        await self._connect()
+                logger.info("Pub/sub connection on %s restored", self.channel)
+                return
+            except Exception as exc:
+                logger.warning("Pub/sub reconnect failed (%s), retrying in %ss", exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+
+    async def _notify(self, payloads):
+        async with self._lock:  # one asyncpg connection, one statement at a time
+            if self._conn is None or self._conn.is_closed():
+                await self._connect()
+            for payload in payloads:
+                await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Dropping malformed notification payload on %s", channel)
+            return
+        if "topic" in message:
+            self.hub.dispatch(message["topic"], message["data"])
+        else:
+            self.hub.deliver(message["user_ids"], message["event"])
+
+    async def publish(self, user_ids, event: dict):
+        await self._notify(list(publish_payloads(user_ids, event)))
+
+    async def broadcast(self, topic: str, data: dict):
+        await self._notify([_encode({"topic": topic, "data": data})])
+
+    async def stop(self):
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+# =========================================================
+# HUB
+# =========================================================
+class NotificationHub:
+    """
+    Keeps one bounded queue per open stream. Publishing goes through the
+    backend; the backend calls deliver() on every worker that should fan the
+    event out to its local queues.
+
+    broadcast() reaches every worker, the sender included, through the same
+    backend and runs the handlers registered with on(); caches use it to
+    invalidate across workers. Before start() (scripts and benchmarks that
+    call crud directly) there is no backend to go through: publish() is a
+    no-op and broadcast() runs the local handlers only.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._started = False
+        self._subscribers = {}
+        self._handlers = {}
+
+    async def start(self):
+        await self.backend.start(self)
+        self._started = True
+
+    async def stop(self):
+        self._started = False
+        await self.backend.stop()
+
+    def subscribe(self, user_id: int):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    async def publish(self, user_ids, event: dict):
+        if not user_ids or not self._started:
+            return
+        try:
+            await self.backend.publish(user_ids, event)
+        except Exception:
+            # live delivery is best effort; the inbox rows are already committed
+            logger.exception("Publishing to %d streams failed", len(user_ids))
+
+    def on(self, topic: str, handler):
+        self._handlers.setdefault(topic, []).append(handler)
+
+    async def broadcast(self, topic: str, data: dict):
+        if not self._started:
+            self.dispatch(topic, data)
+            return
+        try:
+            await self.backend.broadcast(topic, data)
+        except Exception:
+            # the write already happened; other workers catch up when their cache entries expire
+            logger.exception("Broadcast of %s failed", topic)
+
+    def dispatch(self, topic: str, data: dict):
+        for handler in self._handlers.get(topic, ()):
+            handler(data)
+
+    def deliver(self, user_ids, event: dict):
+        for user_id in user_ids:
+            for queue in self._subscribers.get(user_id, ()):
+                if queue.full():
+                    queue.get_nowait()  # slow client: drop its oldest event
+                queue.put_nowait(event)
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "users": len(self._subscribers),
+            "streams": sum(len(q) for q in self._subscribers.values()),
+        }
+
+
+def _make_backend():
+    if PUBSUB_BACKEND == "postgres":
+        from app.database import DATABASE_URL
+        return PostgresBackend(DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1))
+    return InProcessBackend()
+
+
+hub = NotificationHub(_make_backend())
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from datetime import date, datetime
+import asyncio
+import hashlib
+import shutil
+import tempfile
 
-from app import crud, schemas, model
+from app import crud, schemas, model, analytics, export, importer
+from app.cache import reference_cache, reference_version
+from app.profiling import profiler_available, profiler_state
 from app.database import get_db
 from app.routers.auth import admin_required
 
@@ -12,9 +20,18 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 # =========================================================
 # GET ALL USERS (Admin only)
 # =========================================================
-@router.get("/users", response_model=List[schemas.UserRead])
-async def list_users(db: AsyncSession = Depends(get_db), admin: model.User = Depends(admin_required)):
-    return await crud.get_all_users(db)
+@router.get("/users", response_model=schemas.Page[schemas.UserRead])
+async def list_users(
+    role: Optional[schemas.UserRole] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    admin: model.User = Depends(admin_required)
+):
+    return await crud.get_all_users(db, role, is_active, created_from, created_to, cursor, limit)
 
 
 # =========================================================
@@ -28,6 +45,17 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db), admin: mode
     return user
 
 
+# =========================================================
+# UPDATE USER ROLE / STATUS (Admin only)
+# =========================================================
+@router.patch("/users/{user_id}", response_model=schemas.UserRead)
+async def update_user(user_id: int, data: schemas.UserUpdate, db: AsyncSession = Depends(get_db), admin: model.User = Depends(admin_required)):
+    user = await crud.update_user(db, user_id, data)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
 # =========================================================
 # CREATE STUDENT (Admin only)
 # =========================================================
@@ -36,6 +64,19 @@ async def create_student(student: schemas.StudentCreate, db: AsyncSession = Depe
     return await crud.create_student(db, student)
 
 
+# =========================================================
+# STUDENT SUBJECT STATS (Admin only)
+# =========================================================
+@router.get("/students/{student_id}/stats", response_model=List[schemas.StudentSubjectStatsRead])
+async def get_student_stats(student_id: int, db: AsyncSession = Depends(get_db), admin: model.User = Depends(admin_required)):
+    return await crud.get_student_stats(db, student_id)
+
+
+@router.post("/stats/rebuild", status_code=status.HTTP_204_NO_CONTENT)
+async def rebuild_stats(db: AsyncSession = Depends(get_db), admin: model.User = Depends(admin_required)):
+    await crud.rebuild_student_stats(db)
+
+
 # =========================================================
 # CREATE TEACHER (Admin only)
 # =========================================================
@@ -44,6 +85,35 @@ async def create_teacher(teacher: schemas.TeacherCreate, db: AsyncSession = Depe
     return await crud.create_teacher(db, teacher)
 
 
+# =========================================================
+# REFERENCE DATA PAGES (cached per worker, ETag revalidation)
+# =========================================================
+def _etag_matches(if_none_match: Optional[str], etag: str):
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def _reference_page(request: Request, table: str, page_schema, params: tuple, fetch):
+    """
+    Serve a classes/subjects page rendered once per data version. Clients
+    revalidate on every use (no-cache) and get a 304 while the ETag holds.
+    """
+    key = (table, params, reference_version.get(table, 0))
+    cached = reference_cache.get(key)
+    if cached is None:
+        body = page_schema.model_validate(await fetch(), from_attributes=True).model_dump_json().encode()
+        cached = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        reference_cache.set(key, cached)
+
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 # =========================================================
 # CREATE CLASS (Admin only)
 # =========================================================
@@ -63,14 +133,158 @@ async def create_subject(subject: schemas.SubjectCreate, db: AsyncSession = Depe
 # =========================================================
 # LIST ALL CLASSES (Admin only)
 # =========================================================
-@router.get("/classes", response_model=List[schemas.ClassRead])
-async def list_classes(db: AsyncSession = Depends(get_db), admin: model.User = Depends(admin_required)):
-    return await crud.get_all_classes(db)
+@router.get("/classes", response_model=schemas.Page[schemas.ClassRead])
+async def list_classes(
+    request: Request,
+    is_active: Optional[bool] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    admin: model.User = Depends(admin_required)
+):
+    return await _reference_page(
+        request, "classes", schemas.Page[schemas.ClassRead], (is_active, cursor, limit),
+        lambda: crud.get_all_classes(db, is_active, cursor, limit),
+    )
+
+
+# =========================================================
+# CLASS ANALYTICS: RANKS, PERCENTILES, HISTOGRAMS (Admin only)
+# =========================================================
+@router.get("/classes/{class_id}/analytics", response_model=schemas.ClassAnalytics)
+async def class_analytics(
+    class_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    admin: model.User = Depends(admin_required)
+):
+    return await analytics.get_class_analytics(db, class_id, date_from, date_to)
 
 
 # =========================================================
 # LIST ALL SUBJECTS (Admin only)
 # =========================================================
-@router.get("/subjects", response_model=List[schemas.SubjectRead])
-async def list_subjects(db: AsyncSession = Depends(get_db), admin: model.User = Depends(admin_required)):
-    return await crud.get_all_subjects(db)
+@router.get("/subjects", response_model=schemas.Page[schemas.SubjectRead])
+async def list_subjects(
+    request: Request,
+    is_active: Optional[bool] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    admin: model.User = Depends(admin_required)
+):
+    return await _reference_page(
+        request, "subjects", schemas.Page[schemas.SubjectRead], (is_active, cursor, limit),
+        lambda: crud.get_all_subjects(db, is_active, cursor, limit),
+    )
+
+
+# =========================================================
+# EXPORT MARKS / ATTENDANCE / BEHAVIOR (Admin only)
+# =========================================================
+@router.get("/export/{table}")
+async def export_table(
+    table: schemas.ExportTable,
+    format: schemas.ExportFormat = schemas.ExportFormat.csv,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    admin: model.User = Depends(admin_required)
+):
+    row_model = export.EXPORT_MODELS[table.value]
+    filename = f"{table.value}.{format.value}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format == schemas.ExportFormat.parquet:
+        if not export.parquet_available():
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow to be installed")
+        return StreamingResponse(
+            export.stream_parquet(row_model, date_from, date_to),
+            media_type="application/vnd.apache.parquet",
+            headers=headers,
+        )
+
+    return StreamingResponse(
+        export.stream_csv(row_model, date_from, date_to),
+        media_type="text/csv",
+        headers=headers,
+    )
+
+
+# =========================================================
+# BULK IMPORT STUDENTS / TEACHERS FROM CSV (Admin only)
+# =========================================================
+@router.post("/import/{kind}", response_model=schemas.ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def import_users(
+    kind: schemas.ImportKind,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    admin: model.User = Depends(admin_required)
+):
+    # spool the upload to disk so the job can outlive the request; the copy
+    # is blocking file I/O, so it runs off the event loop
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+        await asyncio.to_thread(shutil.copyfileobj, file.file, tmp)
+
+    job = importer.create_job(kind.value)
+    background_tasks.add_task(importer.run_import, job, tmp.name, True)
+    return job
+
+
+@router.get("/import/jobs/{job_id}", response_model=schemas.ImportJobRead)
+async def get_import_job(job_id: str, admin: model.User = Depends(admin_required)):
+    job = importer.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+# =========================================================
+# PROFILING (Admin only, state is per worker)
+# =========================================================
+def _profiler_status():
+    return schemas.ProfilerStatus(
+        available=profiler_available(),
+        enabled=profiler_state.enabled,
+        sample_rate=profiler_state.sample_rate,
+        route_prefix=profiler_state.route_prefix,
+        samples=[schemas.ProfileSampleRead.model_validate(s) for s in reversed(profiler_state.samples)],
+    )
+
+
+@router.get("/profile", response_model=schemas.ProfilerStatus)
+async def get_profiler(admin: model.User = Depends(admin_required)):
+    return _profiler_status()
+
+
+@router.put("/profile", response_model=schemas.ProfilerStatus)
+async def configure_profiler(settings: schemas.ProfilerSettings, admin: model.User = Depends(admin_required)):
+    if settings.enabled and not profiler_available():
+        raise HTTPException(status_code=501, detail="Profiling requires pyinstrument to be installed")
+    profiler_state.configure(settings.enabled, settings.sample_rate, settings.route_prefix)
+    return _profiler_status()
+
+
+PROFILE_MEDIA_TYPES = {
+    schemas.ProfileFormat.speedscope: "application/json",
+    schemas.ProfileFormat.html: "text/html",
+    schemas.ProfileFormat.text: "text/plain",
+}
+
+
+@router.get("/profile/{sample_id}")
+async def get_profile(
+    sample_id: str,
+    format: schemas.ProfileFormat = schemas.ProfileFormat.speedscope,
+    admin: model.User = Depends(admin_required)
+):
+    sample = profiler_state.get(sample_id)
+    if sample is None:
+        raise HTTPException(status_code=404, detail="Profile not found (profiles are kept per worker)")
+
+    body = await asyncio.to_thread(sample.render, format.value)
+    headers = {}
+    if format == schemas.ProfileFormat.speedscope:
+        # open in https://www.speedscope.app
+        headers["Content-Disposition"] = f'attachment; filename="{sample_id}.speedscope.json"'
+    return Response(body, media_type=PROFILE_MEDIA_TYPES[format], headers=headers)
@@ -1,20 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 import os
+import time
 from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
 
 from app.database import get_db
 from app import crud, schemas, model
-from app.crud import pwd_context
+from app.cache import token_cache, user_cache
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 load_dotenv()
 
@@ -24,9 +26,9 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
-
-
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# stream tokens travel in the URL (and so in access logs): keep them short-lived
+STREAM_TOKEN_EXPIRE_SECONDS = int(os.getenv("STREAM_TOKEN_EXPIRE_SECONDS", 60))
+STREAM_TOKEN_SCOPE = "stream"
 
 
 def create_access_token(data: dict, expires_delta: int = None):
@@ -38,6 +40,16 @@ def create_access_token(data: dict, expires_delta: int = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_stream_token(user: model.User):
+    """Token that only opens /notifications/stream, for clients that can't send headers."""
+    return jwt.encode({
+        "sub": str(user.id),
+        "role": user.role.value,
+        "scope": STREAM_TOKEN_SCOPE,
+        "exp": datetime.utcnow() + timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS),
+    }, SECRET_KEY, algorithm=ALGORITHM)
+
+
 # =========================================================
 # HELPERS
 # =========================================================
@@ -45,31 +57,65 @@ async def authenticate_user(db: AsyncSession, email: str, password: str):
     user = await crud.get_user_by_email(db, email)
     if not user:
         return None
-    if not pwd_context.verify(password, user.password):
+    if not await crud.verify_password(password, user.password):
         return None
     return user
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-):
-    try:
+def decode_access_token(token: str, scope: str = None):
+    """
+    Return (user id, role) from `token`, caching the decoded result until the
+    token expires. Role is None for tokens issued before it was a claim.
+    `scope` must match the token's: None for access tokens, so a stream token
+    is refused everywhere but the stream.
+    """
+    claims = token_cache.get(token)
+    if claims is None:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = int(payload.get("sub"))
+        try:
+            user_id = int(payload.get("sub"))
+        except (TypeError, ValueError):
+            raise JWTError("Token has no valid subject")
 
-        user = await crud.get_user(db, user_id)
-        if user is None:
-            raise HTTPException(status_code=404, detail="User not found")
+        claims = (user_id, payload.get("role"), payload.get("scope"))
+        exp = payload.get("exp")
+        token_cache.set(token, claims, exp - time.time() if exp else None)
 
-        return user
+    if claims[2] != scope:
+        raise JWTError("Token is not valid here")
+    return claims[:2]
 
+
+async def resolve_user(token: str, db: AsyncSession, scope: str = None):
+    try:
+        user_id, role = decode_access_token(token, scope)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token or expired token",
         )
 
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    # role-aware load: the student/teacher profile arrives in the same query
+    user = await crud.get_user_with_profile(db, user_id, role)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Detach so the cached instance is never tied to this request's session
+    db.expunge(user)
+    user_cache.set(user_id, user)
+    return user
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+):
+    return await resolve_user(token, db)
+
 
 async def get_current_active_user(user: model.User = Depends(get_current_user)):
     if not user.is_active:
@@ -77,6 +123,29 @@ async def get_current_active_user(user: model.User = Depends(get_current_user)):
     return user
 
 
+async def get_stream_user(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    stream_token: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Like get_current_active_user, but also accepts ?stream_token= from
+    POST /notifications/stream-token (EventSource can't set headers). Access
+    tokens are only taken from the Authorization header, never the URL.
+    """
+    if token:
+        user = await resolve_user(token, db)
+    elif stream_token:
+        user = await resolve_user(stream_token, db, scope=STREAM_TOKEN_SCOPE)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_active_user(user)
+
+
 # =========================================================
 # ROLE AUTH HELPERS
 # =========================================================
@@ -89,12 +158,29 @@ async def admin_required(user: model.User = Depends(get_current_active_user)):
 async def teacher_required(user: model.User = Depends(get_current_active_user)):
     if user.role not in ["teacher", "admin"]:
         raise HTTPException(status_code=403, detail="Teacher or Admin required")
+    if user.role == "teacher" and user.teacher_profile is None:
+        raise HTTPException(status_code=404, detail="Teacher profile not found")
     return user
 
 
+async def ensure_teaches(db: AsyncSession, user: model.User, class_id: int, subject_id: int = None,
+                         detail: str = "You are not assigned to this class"):
+    """
+    Raise 403 unless `user` is assigned to the class (and subject, when
+    given). Admins always pass. Answered from the cached assignment index.
+    """
+    if user.role == "admin":
+        return
+    access = await crud.get_teacher_access(db, user.teacher_profile.id)
+    if not access.teaches(class_id, subject_id):
+        raise HTTPException(status_code=403, detail=detail)
+
+
 async def student_required(user: model.User = Depends(get_current_active_user)):
     if user.role != "student":
         raise HTTPException(status_code=403, detail="Student only endpoint")
+    if user.student_profile is None:
+        raise HTTPException(status_code=404, detail="Student profile not found")
     return user
 
 
@@ -120,7 +206,7 @@ async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
     if not user:
         raise HTTPException(status_code=400, detail="Invalid email or password")
 
-    token = create_access_token({"sub": str(user.id)})
+    token = create_access_token({"sub": str(user.id), "role": user.role.value})
 
     return {
         "access_token": token,
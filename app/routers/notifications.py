@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from sqlalchemy import select
+from datetime import datetime
+import asyncio
+import json
+import os
 
 from app import crud, schemas, model
 from app.database import get_db
-from app.routers.auth import admin_required, teacher_required, student_required
+from app.pubsub import hub
+from app.routers.auth import (
+    admin_required, teacher_required, student_required, get_current_active_user, get_stream_user,
+    ensure_teaches, create_stream_token, STREAM_TOKEN_EXPIRE_SECONDS,
+)
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", 15))
+
 
 # =========================================================
 # CREATE NOTIFICATION (Admin only)
@@ -16,10 +26,12 @@ router = APIRouter(prefix="/notifications", tags=["Notifications"])
 @router.post("/admin", response_model=schemas.NotificationRead)
 async def create_notification_admin(
     data: schemas.NotificationCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     admin: model.User = Depends(admin_required)
 ):
     notif = await crud.create_notification(db, data)
+    background_tasks.add_task(crud.fan_out_notification, notif.id)
     return notif
 
 
@@ -29,18 +41,16 @@ async def create_notification_admin(
 @router.post("/teacher", response_model=schemas.NotificationRead)
 async def create_notification_teacher(
     data: schemas.NotificationCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     teacher: model.User = Depends(teacher_required)
 ):
     # Verify teacher is assigned to target class
-    if data.target_class_id:
-        assignments = await crud.get_teacher_assignments(db, teacher.teacher_profile.id)
-        if not any(a.class_id == data.target_class_id for a in assignments):
-            raise HTTPException(
-                status_code=403,
-                detail="You can only send notifications to your assigned classes"
-            )
+    if data.class_id:
+        await ensure_teaches(db, teacher, data.class_id,
+                             detail="You can only send notifications to your assigned classes")
     notif = await crud.create_notification(db, data)
+    background_tasks.add_task(crud.fan_out_notification, notif.id)
     return notif
 
 
@@ -55,15 +65,106 @@ async def get_my_notifications(
     return await crud.get_notifications_for_user(db, user)
 
 
+# =========================================================
+# UNREAD BADGE COUNT (any role)
+# =========================================================
+@router.get("/unread-count", response_model=schemas.UnreadCount)
+async def get_unread_count(
+    user: model.User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return {"unread": await crud.get_unread_count(db, user.id)}
+
+
+# =========================================================
+# PAGINATED INBOX (any role)
+# =========================================================
+@router.get("/inbox", response_model=schemas.Page[schemas.InboxItem])
+async def get_inbox(
+    unread_only: bool = False,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=crud.MAX_PAGE_SIZE),
+    user: model.User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await crud.get_inbox(db, user.id, unread_only, cursor, limit)
+
+
+# =========================================================
+# LIVE STREAM (Server-Sent Events, any role)
+# =========================================================
+@router.post("/stream-token", response_model=schemas.StreamToken)
+async def get_stream_token(user: model.User = Depends(get_current_active_user)):
+    """For EventSource clients: open /notifications/stream?stream_token=... within expires_in seconds."""
+    return {"stream_token": create_stream_token(user), "expires_in": STREAM_TOKEN_EXPIRE_SECONDS}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    user: model.User = Depends(get_stream_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # auth is done; don't keep a pooled connection for the life of the stream
+    await db.close()
+    queue = hub.subscribe(user.id)
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+        finally:
+            hub.unsubscribe(user.id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# =========================================================
+# MARK ONE / ALL AS READ
+# =========================================================
+@router.post("/read-all", response_model=schemas.UnreadCount)
+async def mark_all_read(
+    user: model.User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    await crud.mark_all_notifications_read(db, user.id)
+    return {"unread": 0}
+
+
+@router.post("/{notification_id}/read", response_model=schemas.UnreadCount)
+async def mark_read(
+    notification_id: int,
+    user: model.User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if not await crud.mark_notification_read(db, user.id, notification_id):
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return {"unread": await crud.get_unread_count(db, user.id)}
+
+
 # =========================================================
 # GET ALL NOTIFICATIONS (Admin view)
 # =========================================================
-@router.get("/all", response_model=List[schemas.NotificationRead])
+@router.get("/all", response_model=schemas.Page[schemas.NotificationRead])
 async def get_all_notifications(
+    class_id: Optional[int] = None,
+    type: Optional[schemas.NotificationType] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=crud.MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db),
     admin: model.User = Depends(admin_required)
 ):
-    result = await db.execute(
-        select(model.Notification)
+    return await crud.get_all_notifications(
+        db, class_id, type, created_from, created_to, cursor, limit
     )
-    return result.scalars().all()
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app import crud, schemas, model
 from app.database import get_db
+from app.metrics import Timings
 from app.routers.auth import student_required
 
 router = APIRouter(prefix="/students", tags=["Students"])
@@ -45,6 +46,17 @@ async def get_my_attendance(
     return await crud.get_attendance(db, user.student_profile.id)
 
 
+# =========================================================
+# GET MY SUBJECT STATS (averages, attendance %)
+# =========================================================
+@router.get("/stats", response_model=List[schemas.StudentSubjectStatsRead])
+async def get_my_stats(
+    user: model.User = Depends(student_required),
+    db: AsyncSession = Depends(get_db)
+):
+    return await crud.get_student_stats(db, user.student_profile.id)
+
+
 # =========================================================
 # GET MY BEHAVIOR REPORT
 # =========================================================
@@ -69,9 +81,12 @@ async def get_my_notifications(
 # =========================================================
 # GET STUDENT SUMMARY
 # =========================================================
-@router.get("/summary")
+@router.get("/summary", response_model=schemas.StudentSummary)
 async def get_my_summary(
-    user: model.User = Depends(student_required),
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    user: model.User = Depends(student_required)
 ):
-    return await crud.get_student_summary(db, user)
\ No newline at end of file
+    timings = Timings()
+    summary = await crud.get_student_summary(user, timings)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return summary
\ No newline at end of file
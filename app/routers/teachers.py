@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from app import crud, schemas, model
 from app.database import get_db
-from app.routers.auth import teacher_required
+from app.metrics import Timings
+from app.routers.auth import ensure_teaches, teacher_required
 
 router = APIRouter(prefix="/teachers", tags=["Teachers"])
 
@@ -17,6 +18,8 @@ async def get_my_profile(
     user: model.User = Depends(teacher_required),
     db: AsyncSession = Depends(get_db)
 ):
+    if user.teacher_profile is None:  # admins have none
+        raise HTTPException(status_code=404, detail="Teacher profile not found")
     teacher = await crud.get_teacher(db, user.teacher_profile.id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
@@ -31,6 +34,8 @@ async def get_my_assignments(
     user: model.User = Depends(teacher_required),
     db: AsyncSession = Depends(get_db)
 ):
+    if user.teacher_profile is None:  # admins have none
+        raise HTTPException(status_code=404, detail="Teacher profile not found")
     assignments = await crud.get_teacher_assignments(db, user.teacher_profile.id)
     return assignments
 
@@ -38,18 +43,18 @@ async def get_my_assignments(
 # =========================================================
 # GET STUDENTS IN A CLASS
 # =========================================================
-@router.get("/classes/{class_id}/students", response_model=List[schemas.StudentRead])
+@router.get("/classes/{class_id}/students", response_model=schemas.Page[schemas.StudentRead])
 async def get_students_in_class(
     class_id: int,
+    is_active: Optional[bool] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=crud.MAX_PAGE_SIZE),
     user: model.User = Depends(teacher_required),
     db: AsyncSession = Depends(get_db)
 ):
-    # Ensure teacher is assigned to this class
-    assignments = await crud.get_teacher_assignments(db, user.teacher_profile.id)
-    if not any(a.class_id == class_id for a in assignments):
-        raise HTTPException(status_code=403, detail="You are not assigned to this class")
+    await ensure_teaches(db, user, class_id)
 
-    students = await crud.get_students_by_class(db, class_id)
+    students = await crud.get_students_by_class(db, class_id, is_active, cursor, limit)
     return students
 
 
@@ -62,13 +67,41 @@ async def add_student_marks(
     user: model.User = Depends(teacher_required),
     db: AsyncSession = Depends(get_db)
 ):
-    # Ensure teacher is assigned to this class/subject
-    assignments = await crud.get_teacher_assignments(db, user.teacher_profile.id)
-    if not any(a.class_id == marks.student_id for a in assignments):
-        raise HTTPException(status_code=403, detail="You are not assigned to this class/subject")
+    # Ensure teacher is assigned to the student's class for this subject
+    class_id = await crud.get_student_class_id(db, marks.student_id)
+    if class_id is None:
+        raise HTTPException(status_code=404, detail="Student not found or not in a class")
+    await ensure_teaches(db, user, class_id, marks.subject_id,
+                         detail="You are not assigned to this class/subject")
     return await crud.add_marks(db, marks)
 
 
+# =========================================================
+# ADD MARKS FOR A WHOLE CLASS
+# =========================================================
+@router.post("/marks/bulk", response_model=schemas.BulkWriteResult)
+async def add_class_marks(
+    data: schemas.MarksBulkCreate,
+    response: Response,
+    user: model.User = Depends(teacher_required),
+    db: AsyncSession = Depends(get_db)
+):
+    if user.teacher_profile is None:
+        raise HTTPException(status_code=403, detail="Teacher profile required to enter marks")
+
+    timings = Timings()
+    teacher_id = user.teacher_profile.id
+    with timings.span("authz"):
+        assigned = await crud.is_teacher_assigned(db, teacher_id, data.class_id, data.subject_id)
+    if not assigned:
+        raise HTTPException(status_code=403, detail="You are not assigned to this class/subject")
+
+    with timings.span("write"):
+        result = await crud.add_marks_bulk(db, data, teacher_id)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return result
+
+
 # =========================================================
 # MARK ATTENDANCE
 # =========================================================
@@ -82,6 +115,32 @@ async def mark_student_attendance(
     return await crud.mark_attendance(db, att)
 
 
+# =========================================================
+# ROLL CALL FOR A WHOLE CLASS
+# =========================================================
+@router.post("/attendance/roll-call", response_model=schemas.BulkWriteResult)
+async def take_roll_call(
+    data: schemas.AttendanceRollCall,
+    response: Response,
+    user: model.User = Depends(teacher_required),
+    db: AsyncSession = Depends(get_db)
+):
+    if user.teacher_profile is None:
+        raise HTTPException(status_code=403, detail="Teacher profile required to take attendance")
+
+    timings = Timings()
+    teacher_id = user.teacher_profile.id
+    with timings.span("authz"):
+        assigned = await crud.is_teacher_assigned(db, teacher_id, data.class_id, data.subject_id)
+    if not assigned:
+        raise HTTPException(status_code=403, detail="You are not assigned to this class/subject")
+
+    with timings.span("write"):
+        result = await crud.mark_attendance_bulk(db, data, teacher_id)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return result
+
+
 # =========================================================
 # ADD BEHAVIOR
 # =========================================================
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, computed_field
+from typing import Optional, List, Dict, Generic, TypeVar
 from datetime import date, time, datetime
 from enum import Enum
 
@@ -37,6 +37,41 @@ class DayEnum(str, Enum):
 class NotificationType(str, Enum):
     new_student = "new_student"
     message = "message"
+    class_message = "class_message"
+    global_message = "global_message"
+
+
+class ExportTable(str, Enum):
+    marks = "marks"
+    attendance = "attendance"
+    behavior = "behavior"
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    parquet = "parquet"
+
+
+class ProfileFormat(str, Enum):
+    speedscope = "speedscope"
+    html = "html"
+    text = "text"
+
+
+class ImportKind(str, Enum):
+    students = "students"
+    teachers = "teachers"
+
+
+# ===========================
+# PAGINATION
+# ===========================
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[int] = None  # pass back as ?cursor= for the next page
 
 
 # ===========================
@@ -52,6 +87,12 @@ class UserCreate(UserBase):
     password: str
 
 
+class UserUpdate(BaseModel):
+    name: Optional[str] = None
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+
+
 class UserRead(UserBase):
     id: int
     is_active: bool
@@ -245,6 +286,35 @@ class MarksRead(MarksBase):
     model_config = {"from_attributes": True}
 
 
+class MarksBulkEntry(BaseModel):
+    student_id: int
+    score: int
+
+
+class MarksBulkCreate(BaseModel):
+    class_id: int
+    subject_id: int
+    date: date
+    entries: List[MarksBulkEntry] = Field(min_length=1, max_length=1000)
+
+
+# ===========================
+# BULK WRITE RESULTS
+# ===========================
+class BulkRowResult(BaseModel):
+    student_id: int
+    status: str  # created | updated | rejected
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkWriteResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    rejected: int = 0
+    results: List[BulkRowResult]
+
+
 # ===========================
 # ATTENDANCE SCHEMAS
 # ===========================
@@ -269,6 +339,47 @@ class AttendanceRead(AttendanceBase):
     model_config = {"from_attributes": True}
 
 
+class RollCallEntry(BaseModel):
+    student_id: int
+    status: AttendanceStatus
+
+
+class AttendanceRollCall(BaseModel):
+    class_id: int
+    subject_id: int
+    date: date
+    entries: List[RollCallEntry] = Field(min_length=1, max_length=1000)
+
+
+# ===========================
+# STUDENT STATS SCHEMAS
+# ===========================
+class StudentSubjectStatsRead(BaseModel):
+    student_id: int
+    subject_id: int
+    marks_count: int
+    marks_total: int
+    attendance_count: int
+    attendance_present: int
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+    @computed_field
+    @property
+    def average_score(self) -> Optional[float]:
+        if not self.marks_count:
+            return None
+        return round(self.marks_total / self.marks_count, 2)
+
+    @computed_field
+    @property
+    def attendance_percentage(self) -> Optional[float]:
+        if not self.attendance_count:
+            return None
+        return round(100 * self.attendance_present / self.attendance_count, 2)
+
+
 # ===========================
 # BEHAVIOR SCHEMAS
 # ===========================
@@ -302,19 +413,41 @@ class NotificationBase(BaseModel):
 
 
 class NotificationCreate(NotificationBase):
-    recipient_ids: List[int]
+    class_id: Optional[int] = None  # None = every active user
 
 
 class NotificationRead(NotificationBase):
     id: int
+    class_id: Optional[int] = None
     is_active: bool
     created_at: datetime
     updated_at: datetime
-    recipients: List[int]
 
     model_config = {"from_attributes": True}
 
 
+class InboxItem(BaseModel):
+    id: int  # recipient row id
+    notification_id: int
+    title: str
+    message: str
+    type: NotificationType
+    class_id: Optional[int] = None
+    is_read: bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class UnreadCount(BaseModel):
+    unread: int
+
+
+class StreamToken(BaseModel):
+    stream_token: str
+    expires_in: int
+
+
 # ===========================
 # NOTIFICATION RECIPIENT SCHEMAS
 # ===========================
@@ -328,3 +461,146 @@ class NotificationRecipientRead(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+# ===========================
+# STUDENT SUMMARY SCHEMAS
+# ===========================
+# Projections: only the columns the summary screen shows
+class SummaryProfile(BaseModel):
+    id: int
+    name: str
+    email: EmailStr
+    class_id: Optional[int] = None
+    age: Optional[int] = None
+    sex: Optional[SexEnum] = None
+
+    model_config = {"from_attributes": True}
+
+
+class SummaryMark(BaseModel):
+    subject_id: int
+    score: Optional[int] = None
+    date: date
+
+    model_config = {"from_attributes": True}
+
+
+class SummaryAttendance(BaseModel):
+    subject_id: int
+    status: AttendanceStatus
+    date: date
+
+    model_config = {"from_attributes": True}
+
+
+class SummaryBehavior(BaseModel):
+    remarks: Optional[str] = None
+    date: date
+
+    model_config = {"from_attributes": True}
+
+
+class SummaryNotification(BaseModel):
+    id: int
+    title: Optional[str] = None
+    message: Optional[str] = None
+    type: Optional[NotificationType] = None
+    is_read: bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class StudentSummary(BaseModel):
+    profile: SummaryProfile
+    marks: List[SummaryMark]
+    attendance: List[SummaryAttendance]
+    behavior: List[SummaryBehavior]
+    notifications: List[SummaryNotification]
+
+
+# ===========================
+# CLASS ANALYTICS SCHEMAS
+# ===========================
+class StudentRank(BaseModel):
+    student_id: int
+    average: float
+    rank: int
+    percentile: float
+
+
+class HistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class SubjectAnalytics(BaseModel):
+    subject_id: int
+    marks_count: int
+    mean: float
+    percentiles: Dict[str, float]
+    histogram: List[HistogramBin]
+    ranking: List[StudentRank]
+
+
+class ClassAnalytics(BaseModel):
+    class_id: int
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    students_graded: int
+    subjects: List[SubjectAnalytics]
+    overall_ranking: List[StudentRank]
+
+
+# ===========================
+# BULK IMPORT SCHEMAS
+# ===========================
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportJobRead(BaseModel):
+    id: str
+    kind: ImportKind
+    status: str
+    rows_read: int
+    created: int
+    skipped: int
+    failed: int
+    errors: List[ImportRowError]
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+# ===========================
+# PROFILING SCHEMAS
+# ===========================
+class ProfilerSettings(BaseModel):
+    enabled: bool
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+    route_prefix: Optional[str] = None  # e.g. "/students" to sample only those routes
+
+
+class ProfileSampleRead(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: Optional[str] = None
+    status: Optional[int] = None
+    duration_ms: Optional[float] = None
+    started_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ProfilerStatus(BaseModel):
+    available: bool
+    enabled: bool
+    sample_rate: float
+    route_prefix: Optional[str] = None
+    samples: List[ProfileSampleRead]
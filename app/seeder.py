@@ -1,62 +1,459 @@
+"""
+Reference data and synthetic, production-sized data for load testing.
 
+    python -m app.seeder                          classes, subjects, weekly timetable
+    python -m app.seeder --schools 5 --years 2    + users, rosters, assignments and history
+
+Every school gets the classes in CLASS_LIST (school 1 under the plain names),
+an admin, teachers, students, a weekly timetable of class assignments and
+`--years` of school days of attendance, marks and behavior. Output depends
+only on the options and --seed. Rows go in through bulk inserts (COPY on
+Postgres) with ids assigned here, so no per-row round trips. Schools that
+already exist are skipped, so re-running is safe.
+
+Run `python -m app.migrate` first. All seeded users share --password.
+"""
+import os
+import time
+import random
 import asyncio
-from sqlalchemy import select
+import argparse
+from datetime import date, datetime, timedelta, time as dt_time
 
-from app.database import engine, AsyncSessionLocal, Base
-from app import crud, schemas, models
+from sqlalchemy import select, func, text
 
+from app import crud, model
+from app.database import engine, AsyncSessionLocal
+from app.hashing import hasher
 
+# =========================================================
+# REFERENCE DATA
+# =========================================================
 CLASS_LIST = [
     *[f"Class {i}" for i in range(1, 11)],
     "Class 11 - Arts", "Class 11 - Commerce", "Class 11 - Medical", "Class 11 - Non-Medical",
     "Class 12 - Arts", "Class 12 - Commerce", "Class 12 - Medical", "Class 12 - Non-Medical"
 ]
 
+SUBJECT_LIST = [
+    "Mathematics", "English", "Science", "Social Studies", "Hindi", "Computer Science",
+    "Physics", "Chemistry", "Biology", "Economics", "Accountancy", "History",
+]
+
+# Weekly timetable: PERIODS_PER_DAY slots on each school day
+SCHOOL_DAYS = [model.DayEnum.mon, model.DayEnum.tue, model.DayEnum.wed, model.DayEnum.thu, model.DayEnum.fri]
+PERIODS_PER_DAY = 8
+FIRST_PERIOD = dt_time(8, 0)
+PERIOD_MINUTES = 45
+
+# Default last day of history: a fixed date, so a run is reproducible on any day
+DEFAULT_END_DATE = date(2025, 6, 30)
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Arjun", "Sai", "Reyansh", "Ishaan", "Kabir", "Rohan", "Dev",
+    "Ananya", "Diya", "Saanvi", "Aadhya", "Kavya", "Isha", "Meera", "Riya", "Tara", "Nisha",
+]
+LAST_NAMES = [
+    "Sharma", "Verma", "Gupta", "Singh", "Kumar", "Patel", "Reddy", "Iyer", "Nair", "Das",
+    "Thakur", "Mehta", "Joshi", "Chopra", "Bose", "Rao", "Malhotra", "Kapoor", "Sinha", "Mishra",
+]
+REMARKS = [
+    "Excellent participation in class", "Homework not submitted", "Helped classmates with project",
+    "Late to class", "Disruptive during lesson", "Outstanding test preparation",
+    "Needs to focus in class", "Showed leadership in group work",
+]
+
+EMAIL_DOMAIN = "example.com"
+INSERT_CHUNK_ROWS = int(os.getenv("SEED_CHUNK_ROWS", 10000))
+
+
+# =========================================================
+# OPTIONS
+# =========================================================
+class SeedConfig:
+    def __init__(self, schools: int = 0, students_per_class: int = 30, teachers_per_school: int = 40,
+                 subjects_per_class: int = 6, periods_per_week: int = 4, years: float = 1,
+                 end_date: date = None, test_every_weeks: int = 2, behavior_rate: float = 0.02,
+                 seed: int = 42, password: str = "password123"):
+        self.schools = schools
+        self.students_per_class = students_per_class
+        self.teachers_per_school = teachers_per_school
+        self.subjects_per_class = min(subjects_per_class, len(SUBJECT_LIST))
+        self.periods_per_week = periods_per_week
+        self.years = years
+        self.end_date = end_date or DEFAULT_END_DATE
+        self.test_every_weeks = max(1, test_every_weeks)
+        self.behavior_rate = behavior_rate
+        self.seed = seed
+        self.password = password
+
+    def rng(self, *scope):
+        """Independent, reproducible random stream per (school, purpose)."""
+        return random.Random(":".join(map(str, (self.seed, *scope))))
+
+    def school_days(self):
+        day = self.end_date - timedelta(days=int(self.years * 365))
+        while day <= self.end_date:
+            if day.weekday() < len(SCHOOL_DAYS):
+                yield day
+            day += timedelta(days=1)
+
+
+# =========================================================
+# BULK INSERT
+# =========================================================
+def _chunks(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _bulk_insert(conn, table, rows):
+    """
+    Insert an iterable of same-shaped dicts INSERT_CHUNK_ROWS at a time:
+    COPY on Postgres, executemany elsewhere. Enum columns carry member names.
+    """
+    count = 0
+    for chunk in _chunks(rows, INSERT_CHUNK_ROWS):
+        if conn.dialect.name == "postgresql":
+            columns = list(chunk[0])
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                table.name, columns=columns, records=[tuple(row[c] for c in columns) for row in chunk],
+            )
+        else:
+            await conn.execute(table.insert(), chunk)
+        count += len(chunk)
+    return count
+
+
+async def _next_id(conn, table):
+    return (await conn.execute(select(func.coalesce(func.max(table.c.id), 0)))).scalar() + 1
+
+
+async def _reset_sequences(conn):
+    """Explicit ids bypass the Postgres sequences; move them past the seeded rows."""
+    if conn.dialect.name != "postgresql":
+        return
+    for table in model.Base.metadata.sorted_tables:
+        if "id" in table.c and table.c.id.primary_key:
+            await conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+            ))
+
+
+def _stamp(day: date):
+    return datetime.combine(day, dt_time(16, 0))
+
+
+# =========================================================
+# REFERENCE: CLASSES, SUBJECTS, TIMETABLE
+# =========================================================
+async def _ensure_named(conn, table, names):
+    """{name: id} for `names`, inserting the missing ones."""
+    result = await conn.execute(select(table.c.name, table.c.id).where(table.c.name.in_(names)))
+    existing = dict(result.all())
+
+    missing = [name for name in names if name not in existing]
+    if missing:
+        next_id = await _next_id(conn, table)
+        now = _stamp(DEFAULT_END_DATE)
+        rows = [
+            {"id": next_id + i, "name": name, "is_active": True, "created_at": now, "updated_at": now}
+            for i, name in enumerate(missing)
+        ]
+        await _bulk_insert(conn, table, rows)
+        existing.update({row["name"]: row["id"] for row in rows})
+    return existing
+
+
+async def _ensure_timetable(conn):
+    """[(schedule_id, weekday index)] for every weekly period slot."""
+    table = model.Schedule.__table__
+    result = await conn.execute(select(table.c.id, table.c.day, table.c.start_time))
+    existing = {(day, start): schedule_id for schedule_id, day, start in result.all()}
+
+    rows, slots = [], []
+    next_id = await _next_id(conn, table)
+    now = _stamp(DEFAULT_END_DATE)
+    for weekday, day in enumerate(SCHOOL_DAYS):
+        for period in range(PERIODS_PER_DAY):
+            start = datetime.combine(DEFAULT_END_DATE, FIRST_PERIOD) + timedelta(minutes=period * PERIOD_MINUTES)
+            key = (day, start.time())
+            if key not in existing:
+                existing[key] = next_id + len(rows)
+                rows.append({
+                    "id": existing[key], "day": day.name, "start_time": start.time(),
+                    "end_time": (start + timedelta(minutes=PERIOD_MINUTES)).time(),
+                    "is_active": True, "created_at": now, "updated_at": now,
+                })
+            slots.append((existing[key], weekday))
+
+    await _bulk_insert(conn, table, rows)
+    return slots
+
+
+def _class_name(school: int, name: str):
+    return name if school == 1 else f"{name} (School {school})"
 
-async def seed():
 
-    # ---------------------------------------
-    # 1. Create Tables
-    # ---------------------------------------
+def _grade(name: str):
+    return int(name.split()[1])
+
+
+async def seed_reference(conn, schools: int = 1):
+    classes = await _ensure_named(
+        conn, model.Class.__table__,
+        [_class_name(school, name) for school in range(1, max(schools, 1) + 1) for name in CLASS_LIST],
+    )
+    subjects = await _ensure_named(conn, model.Subject.__table__, SUBJECT_LIST)
+    timetable = await _ensure_timetable(conn)
+    return classes, subjects, timetable
+
+
+# =========================================================
+# SCHOOL: PEOPLE AND TIMETABLE
+# =========================================================
+def _person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", rng.choice(list(model.SexEnum)).name
+
+
+async def _seed_people(conn, school: int, cfg: SeedConfig, classes: dict, subjects: dict,
+                       timetable: list, password_hash: str):
+    """Users, teachers, students and class assignments of one school. Returns the rosters."""
+    rng = cfg.rng(school, "people")
+    domain = f"school{school}.{EMAIL_DOMAIN}"
+    now = _stamp(cfg.end_date)
+    user_id = await _next_id(conn, model.User.__table__)
+    teacher_id = await _next_id(conn, model.Teacher.__table__)
+    student_id = await _next_id(conn, model.Student.__table__)
+    assignment_id = await _next_id(conn, model.ClassAssignment.__table__)
+    slot_id = await _next_id(conn, model.AssignmentSchedule.__table__)
+
+    users, teachers, teacher_subjects, students = [], [], [], []
+    assignments, assignment_slots = [], []
+
+    def add_user(name, email, role):
+        users.append({
+            "id": user_id + len(users), "name": name, "email": email, "password": password_hash,
+            "role": role, "is_active": True, "created_at": now, "updated_at": now,
+        })
+        return users[-1]["id"]
+
+    add_user(f"School {school} Admin", f"admin@{domain}", "admin")
+
+    # Teachers: one main subject (round robin, so every subject is covered) and sometimes a second
+    subject_ids = [subjects[name] for name in SUBJECT_LIST]
+    teaches = {subject: [] for subject in subject_ids}
+    for i in range(cfg.teachers_per_school):
+        name, sex = _person(rng)
+        uid = add_user(name, f"teacher{i + 1}@{domain}", "teacher")
+        tid = teacher_id + i
+        teachers.append({
+            "id": tid, "user_id": uid, "age": rng.randint(25, 60), "sex": sex,
+            "is_active": True, "created_at": now, "updated_at": now,
+        })
+        own = {subject_ids[i % len(subject_ids)]}
+        if rng.random() < 0.3:
+            own.add(rng.choice(subject_ids))
+        for subject in sorted(own):
+            teacher_subjects.append({"teacher_id": tid, "subject_id": subject})
+            teaches[subject].append(tid)
+
+    load = {t["id"]: 0 for t in teachers}
+    rosters = {}
+    for name in CLASS_LIST:
+        class_id = classes[_class_name(school, name)]
+        grade = _grade(name)
+
+        # Students: ability and attendance habits drive the generated history
+        roster = []
+        for _ in range(cfg.students_per_class):
+            sid = student_id + len(students)
+            student_name, sex = _person(rng)
+            uid = add_user(student_name, f"student{sid}@{domain}", "student")
+            students.append({
+                "id": sid, "user_id": uid, "class_id": class_id, "age": grade + 5 + rng.randint(0, 1),
+                "sex": sex, "is_active": True, "created_at": now, "updated_at": now,
+            })
+            roster.append((sid, rng.gauss(68, 12), rng.uniform(0.82, 0.99)))
+
+        # Assignments: least-loaded teacher of each subject, spread over the class's free slots
+        free_slots = list(timetable)
+        rng.shuffle(free_slots)
+        class_assignments = []
+        for subject in sorted(rng.sample(subject_ids, cfg.subjects_per_class)):
+            candidates = teaches[subject] or list(load)
+            if not candidates:
+                continue
+            tid = min(candidates, key=lambda t: (load[t], t))
+            load[tid] += 1
+            aid = assignment_id + len(assignments)
+            assignments.append({
+                "id": aid, "teacher_id": tid, "class_id": class_id, "subject_id": subject,
+                "is_active": True, "created_at": now, "updated_at": now,
+            })
+
+            weekdays = set()
+            for _ in range(cfg.periods_per_week):
+                if not free_slots:
+                    break
+                schedule_id, weekday = free_slots.pop()
+                weekdays.add(weekday)
+                assignment_slots.append({
+                    "id": slot_id + len(assignment_slots), "assignment_id": aid, "schedule_id": schedule_id,
+                    "is_active": True, "created_at": now, "updated_at": now,
+                })
+            class_assignments.append((tid, subject, sorted(weekdays), rng.gauss(0, 5)))
+
+        rosters[class_id] = (roster, class_assignments)
+
+    await _bulk_insert(conn, model.User.__table__, users)
+    await _bulk_insert(conn, model.Teacher.__table__, teachers)
+    await _bulk_insert(conn, model.teacher_subject_table, teacher_subjects)
+    await _bulk_insert(conn, model.Student.__table__, students)
+    await _bulk_insert(conn, model.ClassAssignment.__table__, assignments)
+    await _bulk_insert(conn, model.AssignmentSchedule.__table__, assignment_slots)
+    return rosters, {"users": len(users), "students": len(students), "assignments": len(assignments)}
+
+
+# =========================================================
+# SCHOOL: HISTORY
+# =========================================================
+def _attendance_rows(cfg: SeedConfig, school: int, rosters: dict, next_id: int):
+    """One row per student per assigned subject on each day the subject is timetabled."""
+    rng = cfg.rng(school, "attendance")
+    for day in cfg.school_days():
+        stamp = _stamp(day)
+        for roster, assignments in rosters.values():
+            for teacher_id, subject_id, weekdays, _ in assignments:
+                if day.weekday() not in weekdays:
+                    continue
+                for student_id, _, presence in roster:
+                    status = "present" if rng.random() < presence else "absent"
+                    yield {
+                        "id": next_id, "student_id": student_id, "teacher_id": teacher_id,
+                        "subject_id": subject_id, "status": status, "date": day,
+                        "is_active": True, "created_at": stamp, "updated_at": stamp,
+                    }
+                    next_id += 1
+
+
+def _marks_rows(cfg: SeedConfig, school: int, rosters: dict, next_id: int):
+    """A test every `test_every_weeks` weeks, on the subject's first timetabled day of that week."""
+    rng = cfg.rng(school, "marks")
+    for day in cfg.school_days():
+        if day.isocalendar()[1] % cfg.test_every_weeks:
+            continue
+        stamp = _stamp(day)
+        for roster, assignments in rosters.values():
+            for teacher_id, subject_id, weekdays, difficulty in assignments:
+                if not weekdays or day.weekday() != weekdays[0]:
+                    continue
+                for student_id, ability, _ in roster:
+                    score = round(rng.gauss(ability + difficulty, 9))
+                    yield {
+                        "id": next_id, "student_id": student_id, "subject_id": subject_id,
+                        "teacher_id": teacher_id, "score": min(100, max(0, score)), "date": day,
+                        "is_active": True, "created_at": stamp, "updated_at": stamp,
+                    }
+                    next_id += 1
+
+
+def _behavior_rows(cfg: SeedConfig, school: int, rosters: dict, next_id: int):
+    rng = cfg.rng(school, "behavior")
+    for day in cfg.school_days():
+        stamp = _stamp(day)
+        for roster, assignments in rosters.values():
+            if not assignments:
+                continue
+            for student_id, _, _ in roster:
+                if rng.random() >= cfg.behavior_rate:
+                    continue
+                yield {
+                    "id": next_id, "student_id": student_id, "teacher_id": rng.choice(assignments)[0],
+                    "remarks": rng.choice(REMARKS), "date": day,
+                    "is_active": True, "created_at": stamp, "updated_at": stamp,
+                }
+                next_id += 1
+
+
+async def _seed_history(conn, school: int, cfg: SeedConfig, rosters: dict):
+    counts = {}
+    for name, row_model, rows in (
+        ("attendance", model.Attendance, _attendance_rows),
+        ("marks", model.Marks, _marks_rows),
+        ("behavior", model.Behavior, _behavior_rows),
+    ):
+        table = row_model.__table__
+        counts[name] = await _bulk_insert(conn, table, rows(cfg, school, rosters, await _next_id(conn, table)))
+    return counts
+
+
+# =========================================================
+# ENTRY POINT
+# =========================================================
+async def seed(cfg: SeedConfig = None):
+    cfg = cfg or SeedConfig()
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("✅ Tables ensured")
-
-    # ---------------------------------------
-    # 2. Insert Classes
-    # ---------------------------------------
-    async with AsyncSessionLocal() as db:
-        for name in CLASS_LIST:
-
-            # Check if class already exists
-            q = await db.execute(select(models.Class).where(models.Class.name == name))
-            if q.scalars().first():
+        classes, subjects, timetable = await seed_reference(conn, cfg.schools)
+        await _reset_sequences(conn)
+    print(f"✅ Reference data: {len(CLASS_LIST)} classes per school, {len(subjects)} subjects, "
+          f"{len(timetable)} weekly periods")
+
+    if cfg.schools:
+        password_hash = await hasher.hash(cfg.password)
+
+    for school in range(1, cfg.schools + 1):
+        async with engine.begin() as conn:
+            admin = await conn.execute(
+                select(model.User.id).where(model.User.email == f"admin@school{school}.{EMAIL_DOMAIN}")
+            )
+            if admin.first() is not None:
+                print(f"⏭️  School {school} already seeded")
                 continue
 
-            # Parse class info
-            if "-" in name:
-                base, stream = name.split("-")
-                base = base.strip()  # "Class 11"
-                stream = stream.strip()
-                class_number = int(base.split()[1])
-                class_in = schemas.ClassCreate(
-                    class_number=class_number,
-                    stream=stream,
-                    name=name
-                )
-            else:
-                class_number = int(name.split()[1])
-                class_in = schemas.ClassCreate(
-                    class_number=class_number,
-                    stream=None,
-                    name=name
-                )
-
-            # Create entry
-            await crud.create_class(db, class_in)
-
-        print("✅ Classes seeded successfully")
+            started = time.perf_counter()
+            rosters, people = await _seed_people(conn, school, cfg, classes, subjects, timetable, password_hash)
+            history = await _seed_history(conn, school, cfg, rosters)
+            await _reset_sequences(conn)
+        print(f"✅ School {school}: {people['users']} users, {people['students']} students, "
+              f"{people['assignments']} assignments, {history['attendance']} attendance, "
+              f"{history['marks']} marks, {history['behavior']} behavior "
+              f"({time.perf_counter() - started:.1f}s)")
+
+    if cfg.schools:
+        async with AsyncSessionLocal() as db:
+            await crud.rebuild_student_stats(db)
+        print(f"✅ Student stats rebuilt. Log in as admin@school1.{EMAIL_DOMAIN} / {cfg.password}")
+
+
+async def _main(cfg: SeedConfig):
+    try:
+        await seed(cfg)
+    finally:
+        await engine.dispose()
+        hasher.shutdown()
 
 
 if __name__ == "__main__":
-    asyncio.run(seed())
+    parser = argparse.ArgumentParser(description="Seed reference data and synthetic schools.")
+    parser.add_argument("--schools", type=int, default=0, help="schools of users and history to generate")
+    parser.add_argument("--students-per-class", type=int, default=30)
+    parser.add_argument("--teachers-per-school", type=int, default=40)
+    parser.add_argument("--subjects-per-class", type=int, default=6)
+    parser.add_argument("--periods-per-week", type=int, default=4, help="timetabled periods per subject")
+    parser.add_argument("--years", type=float, default=1, help="years of history ending at --end-date")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help=f"YYYY-MM-DD, default {DEFAULT_END_DATE}")
+    parser.add_argument("--test-every-weeks", type=int, default=2)
+    parser.add_argument("--behavior-rate", type=float, default=0.02, help="remarks per student per school day")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password123", help="password of every seeded user")
+    args = parser.parse_args()
+    asyncio.run(_main(SeedConfig(**vars(args))))
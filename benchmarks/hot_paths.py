@@ -0,0 +1,307 @@
+"""
+Micro-benchmarks for the CRUD, auth and serialization hot paths.
+
+Times the calls behind the busiest endpoints against a seeded database
+(Postgres, or SQLite as a local stand-in) and counts the SQL statements
+each one issues. Results can be saved as a baseline and later runs
+compared against it: a case regresses when its best median over --passes
+slows down by more than --tolerance, or when it issues more statements
+than before. Query counts do not depend on the machine; timings do, so
+keep one baseline per machine and database.
+
+    python -m app.seeder --schools 2
+    python -m benchmarks.hot_paths --save       # record the baseline
+    python -m benchmarks.hot_paths              # compare, exit 1 on regression
+
+Writes (add_marks) run inside a transaction that is rolled back.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select, func, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app import crud, model, schemas
+from app.cache import token_cache, user_cache
+from app.database import engine, AsyncSessionLocal
+from app.metrics import RequestStats, current_request, instrument_engine
+from app.routers.auth import create_access_token, resolve_user, get_current_active_user, student_required
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Timing differences below this are noise, whatever the percentage
+MIN_REGRESSION_MS = 0.05
+
+
+def _sqlite_savepoints(engine):
+    """
+    pysqlite only BEGINs before DML, so the rolled-back outer transaction of
+    add_marks would not contain its commit. SQLAlchemy's documented fix.
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.connection.dbapi_connection.cursor().execute("BEGIN")  # raw, so it is not counted
+
+
+# =========================================================
+# SAMPLE DATA (the busiest rows, as in index_plans)
+# =========================================================
+async def _busiest(db, column, *where):
+    stmt = select(column).where(*where).group_by(column).order_by(func.count().desc()).limit(1)
+    return (await db.execute(stmt)).scalar()
+
+
+async def sample_data(db: AsyncSession, rows: int):
+    student_id = await _busiest(db, model.Marks.student_id)
+    if student_id is None:
+        sys.exit("No marks found: seed the database first (python -m app.seeder --schools 1)")
+
+    student = await crud.get_student(db, student_id)
+    user = await crud.get_user_with_profile(db, student.user_id, "student")
+    inbox_user_id = await _busiest(db, model.NotificationRecipient.user_id)
+    inbox_user = await crud.get_user(db, inbox_user_id) if inbox_user_id else user
+    subject_id, teacher_id = (await db.execute(
+        select(model.Marks.subject_id, model.Marks.teacher_id).where(model.Marks.student_id == student_id).limit(1)
+    )).first()
+    # a day with no mark yet, so add_marks never hits the (student, subject, date) key
+    marks_date = await db.scalar(
+        select(func.max(model.Marks.date)).where(model.Marks.student_id == student_id)
+    ) + timedelta(days=1)
+
+    students = (await db.execute(
+        select(model.Student).options(selectinload(model.Student.user)).order_by(model.Student.id).limit(rows)
+    )).scalars().all()
+    notifications = list((await db.execute(
+        select(model.Notification).order_by(model.Notification.id.desc()).limit(rows)
+    )).scalars().all())
+    # the seeder writes few notifications; pad with unsaved ones so the case has `rows` objects
+    now = datetime.utcnow()
+    notifications += [
+        model.Notification(
+            id=-i, title=f"Notice {i}", message="Reminder: " + "lorem ipsum " * 20,
+            type=model.NotificationType.global_message, class_id=None, is_active=True,
+            created_at=now, updated_at=now,
+        )
+        for i in range(1, rows - len(notifications) + 1)
+    ]
+
+    return {
+        "params": {
+            "student_id": student_id,
+            "user_id": user.id,
+            "inbox_user_id": inbox_user.id,
+            "subject_id": subject_id,
+            "teacher_id": teacher_id,
+            "marks_date": marks_date.isoformat(),
+            "students": len(students),
+            "notifications": len(notifications),
+        },
+        "user": user,
+        "inbox_user": inbox_user,
+        "token": create_access_token({"sub": str(user.id), "role": user.role.value}),
+        "students": students,
+        "notifications": notifications,
+    }
+
+
+# =========================================================
+# CASES
+# =========================================================
+students_adapter = TypeAdapter(List[schemas.StudentRead])
+notifications_adapter = TypeAdapter(List[schemas.NotificationRead])
+
+
+def build_cases(data):
+    """name -> async callable; each call is one measured operation."""
+    p = data["params"]
+
+    async def student_summary():
+        await crud.get_student_summary(data["user"])
+
+    async def notifications_for_user():
+        async with AsyncSessionLocal() as db:
+            await crud.get_notifications_for_user(db, data["inbox_user"])
+
+    async def add_marks():
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            db = AsyncSession(bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint")
+            try:
+                await crud.add_marks(db, schemas.MarksCreate(
+                    student_id=p["student_id"], subject_id=p["subject_id"],
+                    teacher_id=p["teacher_id"], score=75, date=p["marks_date"],
+                ))
+            finally:
+                await db.close()
+                await trans.rollback()
+
+    async def auth_chain(cold: bool):
+        if cold:
+            token_cache.clear()
+            user_cache.clear()
+        async with AsyncSessionLocal() as db:
+            user = await resolve_user(data["token"], db)
+            await student_required(await get_current_active_user(user))
+
+    async def auth_cold():
+        await auth_chain(cold=True)
+
+    async def auth_cached():
+        await auth_chain(cold=False)
+
+    async def serialize_students():
+        students_adapter.dump_json(students_adapter.validate_python(data["students"], from_attributes=True))
+
+    async def serialize_notifications():
+        notifications_adapter.dump_json(
+            notifications_adapter.validate_python(data["notifications"], from_attributes=True)
+        )
+
+    return {
+        "crud.get_student_summary": student_summary,
+        "crud.get_notifications_for_user": notifications_for_user,
+        "crud.add_marks": add_marks,
+        "auth chain (cold caches)": auth_cold,
+        "auth chain (cached)": auth_cached,
+        f"StudentRead x{p['students']}": serialize_students,
+        f"NotificationRead x{p['notifications']}": serialize_notifications,
+    }
+
+
+# =========================================================
+# MEASURE
+# =========================================================
+async def measure(fn, rounds: int, warmup: int):
+    for _ in range(warmup):
+        await fn()
+
+    timings = []
+    queries = set()
+    for _ in range(rounds):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started_at = time.perf_counter()
+        try:
+            await fn()
+        finally:
+            timings.append((time.perf_counter() - started_at) * 1000)
+            current_request.reset(token)
+        queries.add(stats.queries)
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "min_ms": round(timings[0], 3),
+        "queries": max(queries),
+    }
+
+
+def compare(results, baseline, tolerance: float):
+    """Return a list of (case, reason) for every regression against `baseline`."""
+    regressions = []
+    for name, now in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        if now["queries"] > before["queries"]:
+            regressions.append((name, f"queries {before['queries']} -> {now['queries']}"))
+        slower = now["median_ms"] - before["median_ms"]
+        if slower > MIN_REGRESSION_MS and now["median_ms"] > before["median_ms"] * (1 + tolerance):
+            regressions.append((name, f"median {before['median_ms']:.3f} -> {now['median_ms']:.3f} ms"))
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"\n{'case':<34}{'median ms':>11}{'p95 ms':>10}{'min ms':>10}{'queries':>9}{'vs base':>9}")
+    for name, r in results.items():
+        before = (baseline or {}).get("results", {}).get(name)
+        change = f"{(r['median_ms'] / before['median_ms'] - 1) * 100:+.0f}%" if before and before["median_ms"] else "-"
+        print(f"{name:<34}{r['median_ms']:>11.3f}{r['p95_ms']:>10.3f}{r['min_ms']:>10.3f}{r['queries']:>9}{change:>9}")
+
+
+async def main(args):
+    instrument_engine(engine)
+    if engine.dialect.name == "sqlite":
+        _sqlite_savepoints(engine)
+    baseline_path = Path(args.baseline or BASELINE_DIR / f"hot_paths-{engine.dialect.name}.json")
+
+    async with AsyncSessionLocal() as db:
+        data = await sample_data(db, args.rows)
+    print(f"📌 Sample parameters: {data['params']}")
+
+    cases = build_cases(data)
+    if args.only:
+        cases = {name: fn for name, fn in cases.items() if args.only in name}
+
+    # passes are interleaved so a noisy moment hits one pass of every case,
+    # and the best median per case is kept
+    results = {}
+    for _ in range(args.passes):
+        for name, fn in cases.items():
+            r = await measure(fn, args.rounds, args.warmup)
+            if name not in results or r["median_ms"] < results[name]["median_ms"]:
+                results[name] = r
+    await engine.dispose()
+
+    baseline = None
+    if not args.save and baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline["params"] != data["params"]:
+            print(f"⚠️  Baseline was recorded against different data: {baseline['params']}")
+    print_results(results, baseline)
+
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "machine": platform.node(),
+            "rounds": args.rounds,
+            "passes": args.passes,
+            "params": data["params"],
+            "results": results,
+        }, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {baseline_path}")
+        return 0
+
+    if baseline is None:
+        print(f"\nNo baseline at {baseline_path}; record one with --save")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {baseline_path}:")
+        for name, reason in regressions:
+            print(f"   {name}: {reason}")
+        return 1
+    print(f"\n✅ No regressions against {baseline_path} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50, help="measured calls per case and pass")
+    parser.add_argument("--passes", type=int, default=3, help="passes over all cases (best median kept)")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured calls per case first")
+    parser.add_argument("--rows", type=int, default=500, help="objects per serialization case")
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--baseline", help="baseline file, default benchmarks/baselines/hot_paths-<dialect>.json")
+    parser.add_argument("--save", action="store_true", help="record this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown, 0.25 = 25%%")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,182 @@
+"""
+Before/after query plans for the access-pattern indexes (alembic revision 0003).
+
+Runs EXPLAIN ANALYZE for the queries the API issues most, first against the
+current schema ("after"), then inside a transaction that drops the new
+indexes and restores the old ones ("before"), which is rolled back.
+Postgres only; point DATABASE_URL at a seeded database, never production
+(the DROP INDEX inside the transaction locks the tables while it runs).
+
+    python -m benchmarks.index_plans [--plans] [--runs 3]
+"""
+import sys
+import json
+import asyncio
+import argparse
+
+from sqlalchemy import select, func, text
+
+from app import crud, model
+from app.database import engine
+
+NEW_INDEXES = [
+    "idx_marks_student_date",
+    "idx_attendance_student_date",
+    "idx_behavior_student_date",
+    "idx_student_class",
+    "idx_student_class_active",
+    "idx_assignment_teacher",
+    "idx_assignment_class",
+    "idx_notification_class",
+    "idx_recipient_inbox",
+    "idx_recipient_unread",
+]
+
+OLD_INDEXES = [
+    "CREATE INDEX idx_recipient_inbox ON notification_recipients (user_id, is_read, created_at)",
+    "CREATE INDEX idx_class_name ON classes (name)",
+]
+
+
+# =========================================================
+# SAMPLE PARAMETERS (the busiest rows make the plans interesting)
+# =========================================================
+async def _busiest(conn, column, *where):
+    stmt = select(column).where(*where).group_by(column).order_by(func.count().desc()).limit(1)
+    return (await conn.execute(stmt)).scalar()
+
+
+async def sample_params(conn):
+    nr = model.NotificationRecipient
+    ca = model.ClassAssignment
+    student_id = await _busiest(conn, model.Marks.student_id)
+    class_id = await _busiest(conn, model.Student.class_id, model.Student.class_id.is_not(None))
+    teacher_id = await _busiest(conn, ca.teacher_id)
+    assignment = (await conn.execute(
+        select(ca.class_id, ca.subject_id).where(ca.teacher_id == teacher_id).limit(1)
+    )).first()
+    return {
+        "student_id": student_id,
+        "class_id": class_id,
+        "teacher_id": teacher_id,
+        "assignment": tuple(assignment) if assignment else (None, None),
+        "user_id": await _busiest(conn, nr.user_id),
+    }
+
+
+# =========================================================
+# QUERIES (mirroring app.crud)
+# =========================================================
+def build_queries(p):
+    nr = model.NotificationRecipient
+    ca = model.ClassAssignment
+    class_id, subject_id = p["assignment"]
+    return {
+        "summary marks": crud._summary_marks_query(p["student_id"]),
+        "summary attendance": crud._summary_attendance_query(p["student_id"]),
+        "summary behavior": crud._summary_behavior_query(p["student_id"]),
+        "summary notifications": crud._summary_notifications_query(p["user_id"]),
+        "inbox page": (
+            select(nr.id, nr.notification_id, nr.is_read, nr.created_at, model.Notification.title)
+            .join(model.Notification, model.Notification.id == nr.notification_id)
+            .where(nr.user_id == p["user_id"], nr.is_active == True)
+            .order_by(nr.created_at.desc(), nr.id.desc())
+            .limit(51)
+        ),
+        "unread count": select(func.count(nr.id)).where(
+            nr.user_id == p["user_id"], nr.is_read == False, nr.is_active == True
+        ),
+        "class roster page": (
+            select(model.Student).where(model.Student.class_id == p["class_id"])
+            .order_by(model.Student.id).limit(51)
+        ),
+        "teacher assignment check": select(ca.id).where(
+            ca.teacher_id == p["teacher_id"], ca.class_id == class_id, ca.subject_id == subject_id
+        ).limit(1),
+        "class audience": select(crud._audience_subquery(p["class_id"])),
+        "notifications by class": (
+            select(model.Notification).where(model.Notification.class_id == p["class_id"])
+            .order_by(model.Notification.id.desc()).limit(51)
+        ),
+    }
+
+
+# =========================================================
+# EXPLAIN
+# =========================================================
+def _indexes_used(node, found=None):
+    found = found if found is not None else []
+    if "Index Name" in node and node["Index Name"] not in found:
+        found.append(node["Index Name"])
+    for child in node.get("Plans", ()):
+        _indexes_used(child, found)
+    return found
+
+
+async def explain(conn, stmt, runs: int):
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    best = None
+    for _ in range(runs):
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))
+        plan = result.scalar()
+        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+        if best is None or plan["Execution Time"] < best["Execution Time"]:
+            best = plan
+    text_plan = (await conn.execute(text(f"EXPLAIN {sql}"))).scalars().all()
+    return {
+        "ms": best["Execution Time"],
+        "node": best["Plan"]["Node Type"],
+        "indexes": _indexes_used(best["Plan"]),
+        "plan": text_plan,
+    }
+
+
+async def explain_all(conn, queries, runs):
+    return {name: await explain(conn, stmt, runs) for name, stmt in queries.items()}
+
+
+async def main(show_plans: bool, runs: int):
+    if engine.dialect.name != "postgresql":
+        sys.exit("index_plans needs a Postgres DATABASE_URL")
+
+    async with engine.connect() as conn:
+        params = await sample_params(conn)
+        if params["student_id"] is None:
+            sys.exit("No marks found: seed the database first")
+        print(f"📌 Sample parameters: {params}")
+        queries = build_queries(params)
+
+        after = await explain_all(conn, queries, runs)
+        await conn.rollback()
+
+        async with conn.begin() as trans:
+            for name in NEW_INDEXES:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            for ddl in OLD_INDEXES:
+                await conn.execute(text(ddl))
+            before = await explain_all(conn, queries, runs)
+            await trans.rollback()
+
+    print(f"\n{'query':<26}{'before ms':>11}{'after ms':>11}  after plan")
+    for name in queries:
+        b, a = before[name], after[name]
+        used = ", ".join(a["indexes"]) or "-"
+        print(f"{name:<26}{b['ms']:>11.3f}{a['ms']:>11.3f}  {a['node']} [{used}]")
+
+    if show_plans:
+        for name in queries:
+            print(f"\n=== {name} ===")
+            print("--- before")
+            print("\n".join(before[name]["plan"]))
+            print("--- after")
+            print("\n".join(after[name]["plan"]))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plans", action="store_true", help="print full before/after plans")
+    parser.add_argument("--runs", type=int, default=3, help="EXPLAIN ANALYZE runs per query (best kept)")
+    args = parser.parse_args()
+    asyncio.run(main(args.plans, args.runs))
@@ -1,110 +1,362 @@
-from locust import HttpUser, task, between
+"""
+Role-based load test. Seed first, then point locust at the API:
+
+    python -m app.seeder --schools 3 --years 1
+    locust -f locustfile.py --host http://127.0.0.1:10000 --headless -u 300 -r 30 -t 5m
+
+Students, teachers and admins run weighted tasks against the real routes.
+Accounts are discovered through /admin/users and logged in once into a
+shared token pool, so argon2 logins do not dominate the run (login itself
+is still measured as its own task). When the run ends, every endpoint's
+p95 and error ratio is checked against SLO_P95_MS and, optionally, against
+a baseline from an earlier run; any breach makes locust exit 1.
+
+Environment:
+    LOAD_ADMIN_EMAIL            seeded admin used for discovery (admin@school1.example.com)
+    LOAD_PASSWORD               password of the seeded accounts (password123)
+    LOAD_ACCOUNTS_PER_ROLE      student/teacher accounts in the pool (50)
+    LOAD_SLO_FILE               JSON {"GET /students/summary": 250, ...} overriding SLO_P95_MS
+    LOAD_MAX_FAILURE_RATIO      per-endpoint error budget (0.01)
+    LOAD_BASELINE_FILE          JSON of p95s from an earlier run to compare against
+    LOAD_REGRESSION_TOLERANCE   allowed p95 growth over the baseline (0.2 = +20%)
+    LOAD_WRITE_BASELINE=1       record this run's p95s into LOAD_BASELINE_FILE instead
+"""
+import os
+import json
 import random
+import itertools
+from datetime import date, timedelta
+
+from gevent.lock import Semaphore
+from locust import HttpUser, task, between, events
+from locust.runners import WorkerRunner
+
+# =========================================================
+# CONFIG
+# =========================================================
+ADMIN_EMAIL = os.getenv("LOAD_ADMIN_EMAIL", "admin@school1.example.com")
+PASSWORD = os.getenv("LOAD_PASSWORD", "password123")
+ACCOUNTS_PER_ROLE = int(os.getenv("LOAD_ACCOUNTS_PER_ROLE", 50))
+
+MAX_FAILURE_RATIO = float(os.getenv("LOAD_MAX_FAILURE_RATIO", 0.01))
+BASELINE_FILE = os.getenv("LOAD_BASELINE_FILE")
+REGRESSION_TOLERANCE = float(os.getenv("LOAD_REGRESSION_TOLERANCE", 0.2))
+WRITE_BASELINE = os.getenv("LOAD_WRITE_BASELINE", "0") == "1"
+
+# p95 budget per "METHOD name", in milliseconds
+DEFAULT_P95_MS = 200
+SLO_P95_MS = {
+    "POST /auth/login": 600,  # argon2 verify
+    "GET /students/summary": 300,
+    "POST /teachers/marks": 300,
+    "POST /teachers/marks/bulk": 800,
+    "POST /teachers/attendance/roll-call": 800,
+    "GET /admin/classes/{id}/analytics": 1000,
+    "POST /notifications/teacher": 300,
+}
+if os.getenv("LOAD_SLO_FILE"):
+    with open(os.environ["LOAD_SLO_FILE"]) as fh:
+        SLO_P95_MS.update(json.load(fh))
+
+SETUP_PREFIX = "[setup] "
+
+# POST /teachers/marks is a plain insert, so every single mark needs its own
+# (student, subject, date). Each load-generator process counts days up from
+# a random base past the seeded history; processes and runs land on
+# different stretches of the calendar.
+SINGLE_MARK_DAYS = itertools.count(random.randrange(0, 2_000_000))
+SINGLE_MARK_EPOCH = date(2100, 1, 1)
+
+
+# =========================================================
+# TOKEN POOL
+# =========================================================
+class TokenPool:
+    """
+    Seeded accounts per role, each logged in at most once per token lifetime
+    and shared by every simulated user of that role.
+    """
+
+    def __init__(self):
+        self._lock = Semaphore()
+        self._accounts = {}
+        self._tokens = {}
+        self._turn = itertools.count()
+
+    def _discover(self, client):
+        admin_token = self.login(client, ADMIN_EMAIL, name=SETUP_PREFIX + "/auth/login")
+        if admin_token is None:
+            raise RuntimeError(f"Cannot log in as {ADMIN_EMAIL}: seed the database with app.seeder first")
+
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        self._accounts["admin"] = [ADMIN_EMAIL]
+        for role in ("student", "teacher"):
+            emails, cursor = [], None
+            while len(emails) < ACCOUNTS_PER_ROLE:
+                params = {"role": role, "is_active": "true", "limit": 200}
+                if cursor is not None:
+                    params["cursor"] = cursor
+                page = client.get("/admin/users", params=params, headers=headers,
+                                  name=SETUP_PREFIX + "/admin/users").json()
+                emails += [u["email"] for u in page["items"]]
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            if not emails:
+                raise RuntimeError(f"No active {role} accounts found")
+            self._accounts[role] = emails[:ACCOUNTS_PER_ROLE]
+
+    def login(self, client, email: str, name: str = "/auth/login"):
+        response = client.post("/auth/login", data={"username": email, "password": PASSWORD}, name=name)
+        if response.status_code != 200:
+            return None
+        self._tokens[email] = response.json()["access_token"]
+        return self._tokens[email]
+
+    def checkout(self, client, role: str):
+        """Next account of `role` (round robin) with a token, logging it in if needed."""
+        with self._lock:
+            if not self._accounts:
+                self._discover(client)
+            accounts = self._accounts[role]
+            email = accounts[next(self._turn) % len(accounts)]
+            token = self._tokens.get(email) or self.login(client, email, name=SETUP_PREFIX + "/auth/login")
+        return email, token
+
+    def expire(self, email: str):
+        self._tokens.pop(email, None)
+
+
+pool = TokenPool()
 
-class SchoolAPIUser(HttpUser):
-    host = "http://127.0.0.1:10000"
+
+# =========================================================
+# BASE USER
+# =========================================================
+class SchoolUser(HttpUser):
+    abstract = True
+    role = None
     wait_time = between(1, 3)
-    
+
     def on_start(self):
-        """
-        Authenticate once per user
-        """
-        # Try to login with test credentials
-        response = self.client.post(
-            "/auth/login",
-            data={
-                "username": "testuser@school.com",
-                "password": "password123",
-            },
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded"
-            },
-            name="LOGIN"
-        )
-
-        if response.status_code == 200:
-            self.token = response.json().get("access_token")
-            self.headers = {
-                "Authorization": f"Bearer {self.token}"
-            }
-        else:
-            # If login fails, continue without auth
-            self.token = None
-            self.headers = {}
-            print(f"⚠️ Login failed: {response.status_code}")
-
-    # ========== STUDENT ENDPOINTS ==========
-    @task(3)
-    def get_students(self):
-        """Read all students"""
-        self.client.get(
-            "/students/",
-            headers=self.headers,
-            name="GET /students"
-        )
+        self.email, token = pool.checkout(self.client, self.role)
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def api(self, method: str, path: str, name: str = None, **kwargs):
+        response = self.client.request(method, path, headers=self.headers, name=name or path, **kwargs)
+        if response.status_code == 401:  # token expired mid-run: next call uses a fresh one
+            pool.expire(self.email)
+            self.email, token = pool.checkout(self.client, self.role)
+            self.headers = {"Authorization": f"Bearer {token}"}
+        return response
+
+    @task(1)
+    def login(self):
+        """Measure login itself; the pooled token is refreshed as a side effect."""
+        token = pool.login(self.client, self.email)
+        if token is not None:
+            self.headers = {"Authorization": f"Bearer {token}"}
+
+
+# =========================================================
+# STUDENTS
+# =========================================================
+class StudentUser(SchoolUser):
+    role = "student"
+    weight = 8
+
+    @task(6)
+    def summary(self):
+        self.api("GET", "/students/summary")
+
+    @task(2)
+    def marks(self):
+        self.api("GET", "/students/marks")
+
+    @task(1)
+    def attendance(self):
+        self.api("GET", "/students/attendance")
+
+    @task(2)
+    def stats(self):
+        self.api("GET", "/students/stats")
+
+    @task(4)
+    def unread_count(self):
+        self.api("GET", "/notifications/unread-count")
+
+    @task(2)
+    def inbox(self):
+        response = self.api("GET", "/notifications/inbox", params={"limit": 20})
+        if response.status_code != 200:
+            return
+        unread = [item for item in response.json()["items"] if not item["is_read"]]
+        if unread and random.random() < 0.5:
+            self.api("POST", f"/notifications/{unread[0]['notification_id']}/read",
+                     name="/notifications/{id}/read")
+
+    @task(1)
+    def notifications(self):
+        self.api("GET", "/notifications/me")
+
+
+# =========================================================
+# TEACHERS
+# =========================================================
+class TeacherUser(SchoolUser):
+    role = "teacher"
+    weight = 2
+
+    def on_start(self):
+        super().on_start()
+        me = self.api("GET", "/teachers/me").json()
+        self.teacher_id = me["id"]
+        self.assignments = self.api("GET", "/teachers/assignments").json()
+        self.rosters = {}
+
+    def _assignment(self):
+        """A random assignment of this teacher with its (cached) class roster."""
+        if not self.assignments:
+            return None, []
+        assignment = random.choice(self.assignments)
+        class_id = assignment["class_id"]
+        if class_id not in self.rosters:
+            page = self.api("GET", f"/teachers/classes/{class_id}/students", params={"limit": 200},
+                            name="/teachers/classes/{id}/students")
+            self.rosters[class_id] = [s["id"] for s in page.json()["items"]] if page.status_code == 200 else []
+        return assignment, self.rosters[class_id]
+
+    @task(2)
+    def assignments_list(self):
+        self.api("GET", "/teachers/assignments")
 
     @task(2)
-    def get_student_detail(self):
-        """Read specific student"""
-        student_id = random.randint(1, 10)
-        self.client.get(
-            f"/students/{student_id}",
-            headers=self.headers,
-            name="GET /students/{id}"
-        )
+    def roster(self):
+        if self.assignments:
+            class_id = random.choice(self.assignments)["class_id"]
+            self.api("GET", f"/teachers/classes/{class_id}/students", params={"limit": 50},
+                     name="/teachers/classes/{id}/students")
+
+    @task(3)
+    def add_mark(self):
+        assignment, roster = self._assignment()
+        if not roster:
+            return
+        day = SINGLE_MARK_EPOCH + timedelta(days=next(SINGLE_MARK_DAYS))
+        self.api("POST", "/teachers/marks", json={
+            "student_id": random.choice(roster), "subject_id": assignment["subject_id"],
+            "teacher_id": self.teacher_id, "score": random.randint(30, 100), "date": day.isoformat(),
+        })
 
     @task(1)
-    def create_student(self):
-        """Create a new student"""
-        if not self.token:
+    def grade_class(self):
+        assignment, roster = self._assignment()
+        if not roster:
             return
-        self.client.post(
-            "/students/",
-            json={
-                "first_name": f"Student_{random.randint(1000, 9999)}",
-                "last_name": "Test",
-                "email": f"student{random.randint(1000, 9999)}@school.com",
-                "date_of_birth": "2010-01-15",
-            },
-            headers=self.headers,
-            name="POST /students"
-        )
-
-    # ========== TEACHER ENDPOINTS ==========
+        self.api("POST", "/teachers/marks/bulk", json={
+            "class_id": assignment["class_id"], "subject_id": assignment["subject_id"],
+            "date": date.today().isoformat(),
+            "entries": [{"student_id": s, "score": random.randint(30, 100)} for s in roster],
+        })
+
+    @task(1)
+    def roll_call(self):
+        assignment, roster = self._assignment()
+        if not roster:
+            return
+        self.api("POST", "/teachers/attendance/roll-call", json={
+            "class_id": assignment["class_id"], "subject_id": assignment["subject_id"],
+            "date": date.today().isoformat(),
+            "entries": [{"student_id": s, "status": "Present" if random.random() < 0.92 else "Absent"}
+                        for s in roster],
+        })
+
+    @task(1)
+    def notify_class(self):
+        if random.random() < 0.2 and self.assignments:
+            self.api("POST", "/notifications/teacher", json={
+                "title": "Homework", "message": "Chapter exercises due Friday.",
+                "type": "class_message", "class_id": random.choice(self.assignments)["class_id"],
+            })
+
     @task(2)
-    def get_teachers(self):
-        """Read all teachers"""
-        self.client.get(
-            "/teachers/",
-            headers=self.headers,
-            name="GET /teachers"
-        )
+    def unread_count(self):
+        self.api("GET", "/notifications/unread-count")
+
+
+# =========================================================
+# ADMINS
+# =========================================================
+class AdminUser(SchoolUser):
+    role = "admin"
+    weight = 1
+
+    def on_start(self):
+        super().on_start()
+        page = self.api("GET", "/admin/classes", params={"limit": 200}).json()
+        self.class_ids = [c["id"] for c in page["items"]]
+
+    @task(3)
+    def users(self):
+        self.api("GET", "/admin/users", params={"role": random.choice(["student", "teacher"]), "limit": 50})
+
+    @task(2)
+    def classes(self):
+        self.api("GET", "/admin/classes", params={"limit": 50})
 
     @task(1)
-    def get_teacher_detail(self):
-        """Read specific teacher"""
-        teacher_id = random.randint(1, 5)
-        self.client.get(
-            f"/teachers/{teacher_id}",
-            headers=self.headers,
-            name="GET /teachers/{id}"
-        )
-
-    # ========== NOTIFICATION ENDPOINTS ==========
+    def subjects(self):
+        self.api("GET", "/admin/subjects", params={"limit": 50})
+
     @task(2)
-    def get_notifications(self):
-        """Get notifications"""
-        self.client.get(
-            "/notifications/",
-            headers=self.headers,
-            name="GET /notifications"
-        )
-
-    # ========== HEALTH CHECK ==========
-    @task(5)
-    def health_check(self):
-        """Health check endpoint"""
-        self.client.get(
-            "/",
-            name="GET /"
-        )
+    def analytics(self):
+        if self.class_ids:
+            self.api("GET", f"/admin/classes/{random.choice(self.class_ids)}/analytics",
+                     name="/admin/classes/{id}/analytics")
+
+    @task(2)
+    def notifications(self):
+        self.api("GET", "/notifications/all", params={"limit": 50})
+
+
+# =========================================================
+# SLO GATE
+# =========================================================
+@events.quitting.add_listener
+def check_slos(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return  # the master holds the aggregated stats
+
+    baseline = {}
+    if BASELINE_FILE and not WRITE_BASELINE and os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as fh:
+            baseline = json.load(fh)
+
+    p95s, breaches = {}, []
+    for entry in environment.stats.entries.values():
+        if entry.name.startswith(SETUP_PREFIX) or not entry.num_requests:
+            continue
+        key = f"{entry.method} {entry.name}"
+        p95 = entry.get_response_time_percentile(0.95)
+        p95s[key] = p95
+
+        budget = SLO_P95_MS.get(key, DEFAULT_P95_MS)
+        if p95 > budget:
+            breaches.append(f"{key}: p95 {p95:.0f} ms > SLO {budget} ms")
+        if key in baseline and p95 > baseline[key] * (1 + REGRESSION_TOLERANCE):
+            breaches.append(f"{key}: p95 {p95:.0f} ms regressed from baseline {baseline[key]:.0f} ms")
+        if entry.fail_ratio > MAX_FAILURE_RATIO:
+            breaches.append(f"{key}: {entry.fail_ratio:.1%} errors > {MAX_FAILURE_RATIO:.1%}")
+
+    if WRITE_BASELINE and BASELINE_FILE:
+        with open(BASELINE_FILE, "w") as fh:
+            json.dump(p95s, fh, indent=2, sort_keys=True)
+        print(f"📝 Baseline p95s written to {BASELINE_FILE}")
+
+    if breaches:
+        print("❌ SLO breaches:")
+        for breach in breaches:
+            print(f"  {breach}")
+        environment.process_exit_code = 1
+    else:
+        print(f"✅ All {len(p95s)} endpoints within SLO")
@@ -0,0 +1,25 @@
+import os
+import asyncio
+import tempfile
+
+import pytest
+
+# app.database reads these at import time
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.database import engine  # noqa: E402
+from app.model import Base  # noqa: E402
+
+
+async def _reset_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def schema():
+    """A fresh, empty schema for each test."""
+    asyncio.run(_reset_schema())
@@ -0,0 +1,22 @@
+import pytest
+from jose import JWTError
+
+from app import model
+from app.routers.auth import STREAM_TOKEN_SCOPE, create_access_token, create_stream_token, decode_access_token
+
+
+def test_stream_token_only_opens_the_stream():
+    user = model.User(id=7, role=model.UserRole.student)
+    token = create_stream_token(user)
+
+    assert decode_access_token(token, STREAM_TOKEN_SCOPE) == (7, "student")
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+
+
+def test_access_token_is_not_a_stream_token():
+    token = create_access_token({"sub": "7", "role": "student"})
+
+    assert decode_access_token(token) == (7, "student")
+    with pytest.raises(JWTError):
+        decode_access_token(token, STREAM_TOKEN_SCOPE)
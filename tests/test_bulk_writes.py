@@ -0,0 +1,31 @@
+import asyncio
+from datetime import date
+
+from app import crud, model, schemas
+from app.database import AsyncSessionLocal, engine
+
+
+def test_bulk_marks_counts_and_inactive_students(schema):
+    async def go():
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add_all([model.Class(id=1, name="C1"), model.Subject(id=1, name="S1")])
+                db.add_all([model.Student(id=1, class_id=1), model.Student(id=2, class_id=1, is_active=False)])
+                await db.commit()
+
+            sheet = schemas.MarksBulkCreate(class_id=1, subject_id=1, date=date(2025, 1, 1), entries=[
+                {"student_id": 1, "score": 70}, {"student_id": 2, "score": 80},
+            ])
+            results = []
+            for _ in range(2):
+                async with AsyncSessionLocal() as db:
+                    results.append(await crud.add_marks_bulk(db, sheet, teacher_id=None))
+            return results
+        finally:
+            await engine.dispose()
+
+    first, second = asyncio.run(go())
+
+    assert (first.created, first.updated, first.rejected) == (1, 0, 1)
+    assert (second.created, second.updated, second.rejected) == (0, 1, 1)
+    assert [r.status for r in first.results] == ["rejected", "created"]
@@ -0,0 +1,48 @@
+import asyncio
+
+from sqlalchemy import select, func
+
+from app import model
+from app.database import AsyncSessionLocal, engine
+from app.importer import create_job, run_import
+
+
+def _import(tmp_path, rows):
+    path = tmp_path / "students.csv"
+    path.write_text("name,email,password,age,sex,class_id\n" + "".join(f"{r}\n" for r in rows))
+
+    async def go():
+        job = await run_import(create_job("students"), str(path))
+        async with AsyncSessionLocal() as db:
+            users = await db.scalar(select(func.count(model.User.id)))
+            students = await db.scalar(select(func.count(model.Student.id)))
+        await engine.dispose()
+        return job, users, students
+
+    return asyncio.run(go())
+
+
+def test_duplicate_email_in_batch_is_reported(schema, tmp_path):
+    job, users, students = _import(tmp_path, [
+        "A One,a1@x.com,password123,12,male,",
+        "A Two,a1@x.com,password123,13,female,",
+    ])
+
+    assert job.status == "done"
+    assert (job.created, job.failed) == (1, 1)
+    assert job.errors == [{"line": 3, "error": "duplicate email in file"}]
+    assert (users, students) == (1, 1)
+
+
+def test_duplicate_email_across_batches_is_reported(schema, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.importer.IMPORT_BATCH_SIZE", 1)
+    job, users, students = _import(tmp_path, [
+        "A One,a1@x.com,password123,12,male,",
+        "B One,b1@x.com,password123,12,male,",
+        "A Two,a1@x.com,password123,13,female,",
+    ])
+
+    assert job.status == "done"
+    assert (job.created, job.failed) == (2, 1)
+    assert job.errors == [{"line": 4, "error": "duplicate email in file"}]
+    assert (users, students) == (2, 2)
@@ -0,0 +1,42 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app import crud, model
+from app.database import AsyncSessionLocal, engine
+
+
+def test_class_fan_out_skips_deactivated_users(schema):
+    async def go():
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(model.Class(id=1, name="C1"))
+                for user_id, active in ((1, True), (2, False), (3, True), (4, False)):
+                    db.add(model.User(id=user_id, name=f"U{user_id}", email=f"u{user_id}@x.com",
+                                      password="x", role=model.UserRole.student, is_active=active))
+                await db.flush()
+                db.add_all([
+                    model.Student(user_id=1, class_id=1),
+                    model.Student(user_id=2, class_id=1),  # account deactivated
+                    model.Teacher(id=1, user_id=3),
+                    model.Teacher(id=2, user_id=4),  # account deactivated
+                ])
+                await db.flush()
+                db.add_all([
+                    model.ClassAssignment(teacher_id=1, class_id=1, subject_id=None),
+                    model.ClassAssignment(teacher_id=2, class_id=1, subject_id=None),
+                ])
+                notification = model.Notification(
+                    title="t", message="m", type=model.NotificationType.class_message, class_id=1
+                )
+                db.add(notification)
+                await db.commit()
+
+            await crud.fan_out_notification(notification.id)
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(model.NotificationRecipient.user_id).order_by("user_id"))
+                return result.scalars().all()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(go()) == [1, 3]
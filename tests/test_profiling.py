@@ -0,0 +1,33 @@
+import asyncio
+
+from app import profiling
+from app.profiling import ProfilerState
+
+
+def test_concurrent_forced_requests_claim_the_profiler_once(monkeypatch):
+    async def slow_admin_check(scope):
+        await asyncio.sleep(0.01)
+        return True
+
+    monkeypatch.setattr(profiling, "_forced_by_admin", slow_admin_check)
+    monkeypatch.setattr(profiling, "profiler_available", lambda: True)
+    state = ProfilerState()
+    scope = {"path": "/students/summary", "headers": []}
+
+    async def go():
+        return await asyncio.gather(state.should_sample(scope), state.should_sample(scope))
+
+    assert sorted(asyncio.run(go())) == [False, True]
+    assert state.busy
+
+
+def test_unsampled_request_releases_the_profiler(monkeypatch):
+    async def not_admin(scope):
+        return False
+
+    monkeypatch.setattr(profiling, "_forced_by_admin", not_admin)
+    monkeypatch.setattr(profiling, "profiler_available", lambda: True)
+    state = ProfilerState()
+
+    assert asyncio.run(state.should_sample({"path": "/", "headers": []})) is False
+    assert not state.busy
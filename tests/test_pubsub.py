@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from app.pubsub import NOTIFY_PAYLOAD_BYTES, publish_payloads
+
+
+def _event(message):
+    return {"id": 1, "title": "सूचना", "message": message, "type": "global_message", "class_id": None}
+
+
+def test_long_non_ascii_event_is_split_under_notify_limit():
+    event = _event("विद्यालय " * 125)  # 1125 characters of Devanagari
+    user_ids = list(range(1_000_000, 1_002_000))
+
+    payloads = list(publish_payloads(user_ids, event))
+
+    assert len(payloads) > 1
+    assert all(len(p.encode()) <= NOTIFY_PAYLOAD_BYTES for p in payloads)
+    messages = [json.loads(p) for p in payloads]
+    assert all(m["event"] == event for m in messages)
+    assert [uid for m in messages for uid in m["user_ids"]] == user_ids
+
+
+def test_event_too_large_for_one_payload_raises():
+    with pytest.raises(ValueError):
+        list(publish_payloads([1], _event("x" * NOTIFY_PAYLOAD_BYTES)))
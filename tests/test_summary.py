@@ -0,0 +1,37 @@
+import asyncio
+from datetime import date
+
+from app import crud, model
+from app.database import AsyncSessionLocal, engine
+
+
+def test_summary_allows_null_remarks_scores_and_titles(schema):
+    async def go():
+        try:
+            return await build_and_summarize()
+        finally:
+            await engine.dispose()
+
+    async def build_and_summarize():
+        async with AsyncSessionLocal() as db:
+            user = model.User(name="S", email="s@x.com", password="x", role=model.UserRole.student)
+            notification = model.Notification(title=None, message=None, type=None)
+            db.add_all([user, notification])
+            await db.flush()
+            student = model.Student(user_id=user.id)
+            db.add(student)
+            await db.flush()
+            db.add_all([
+                model.Marks(student_id=student.id, subject_id=1, score=None, date=date(2025, 1, 1)),
+                model.Behavior(student_id=student.id, remarks=None, date=date(2025, 1, 1)),
+                model.NotificationRecipient(notification_id=notification.id, user_id=user.id),
+            ])
+            await db.commit()
+            user = await crud.get_user_with_profile(db, user.id, "student")
+        return await crud.get_student_summary(user)
+
+    summary = asyncio.run(go())
+
+    assert summary.marks[0].score is None
+    assert summary.behavior[0].remarks is None
+    assert summary.notifications[0].title is None